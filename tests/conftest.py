@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# Cache locations are read at import, so point them at a scratch directory before the server loads
+_scratch = tempfile.mkdtemp(prefix="hikaya-tests-")
+os.environ["HIKAYA_CACHE_DIR"] = os.path.join(_scratch, "audio")
+os.environ["HIKAYA_STORY_CACHE"] = os.path.join(_scratch, "stories.json")
+# Stories come from the templates; nothing here should call Claude
+os.environ.pop("ANTHROPIC_API_KEY", None)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,119 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from voice_storyteller_server import PersistentAudioCache
+
+
+@pytest.mark.parametrize("manifest", [
+    [1, 2, 3],
+    {"bad": "not an entry", "worse": None, "odd": {"audio_file": 42, "created_at": "yesterday"}},
+])
+def test_malformed_manifest_starts_an_empty_cache(tmp_path, manifest):
+    (tmp_path / PersistentAudioCache.MANIFEST_NAME).write_text(json.dumps(manifest))
+    cache = PersistentAudioCache(str(tmp_path))
+    assert cache.get("bad") is None
+    assert len(cache._entries) == 0
+
+
+def _cached_result(tmp_path, name, size=1):
+    audio_file = tmp_path / f"{name}.mp3"
+    audio_file.write_bytes(b"x" * size)
+    return {"success": True, "engine": "gtts", "audio_file": str(audio_file)}
+
+
+def test_cache_hit_returns_only_the_narration_result(tmp_path):
+    cache = PersistentAudioCache(str(tmp_path))
+    cache.put("story", _cached_result(tmp_path, "story"))
+    
+    assert cache.get("story") == {"success": True, "engine": "gtts",
+                                  "audio_file": str(tmp_path / "story.mp3"), "cache_hit": True}
+    assert cache.get("missing") is None
+
+
+def test_cache_evicts_least_recently_used_entry_over_count(tmp_path):
+    cache = PersistentAudioCache(str(tmp_path), max_size=2)
+    cache.put("first", _cached_result(tmp_path, "first"))
+    cache.put("second", _cached_result(tmp_path, "second"))
+    assert cache.get("first")
+    cache.put("third", _cached_result(tmp_path, "third"))
+    
+    assert cache.get("second") is None
+    assert not (tmp_path / "second.mp3").exists()
+    assert cache.get("first") and cache.get("third")
+
+
+def test_cache_evicts_least_recently_used_entry_over_byte_budget(tmp_path):
+    cache = PersistentAudioCache(str(tmp_path), max_bytes=25)
+    cache.put("first", _cached_result(tmp_path, "first", size=10))
+    cache.put("second", _cached_result(tmp_path, "second", size=10))
+    cache.put("third", _cached_result(tmp_path, "third", size=10))
+    
+    assert cache.get("first") is None
+    assert cache._total_bytes == 20
+
+
+def test_cache_expires_entries_past_their_ttl(tmp_path, monkeypatch):
+    import voice_storyteller_server as server
+    cache = PersistentAudioCache(str(tmp_path), ttl=60)
+    cache.put("story", _cached_result(tmp_path, "story"))
+    assert cache.get("story")
+    
+    now = server.time.time()
+    monkeypatch.setattr(server.time, "time", lambda: now + 61)
+    assert cache.get("story") is None
+    assert not (tmp_path / "story.mp3").exists()
+    # Expired entries are also dropped when a later run loads the manifest
+    cache.put("fresh", _cached_result(tmp_path, "fresh"))
+    monkeypatch.setattr(server.time, "time", lambda: now + 200)
+    assert len(PersistentAudioCache(str(tmp_path), ttl=60)._entries) == 0
+
+
+async def test_puts_on_the_loop_share_one_deferred_manifest_write(tmp_path, monkeypatch):
+    cache = PersistentAudioCache(str(tmp_path))
+    writes = []
+    write_manifest = cache._write_manifest
+    
+    def _write(entries):
+        writes.append(sorted(entries))
+        write_manifest(entries)
+    
+    monkeypatch.setattr(cache, "_write_manifest", _write)
+    for name in ("first", "second", "third"):
+        cache.put(name, _cached_result(tmp_path, name))
+    assert writes == []
+    
+    await cache.flush()
+    assert writes == [["first", "second", "third"]]
+    assert len(PersistentAudioCache(str(tmp_path))._entries) == 3
+
+
+def test_loading_an_oversized_cache_evicts_down_to_budget(tmp_path):
+    cache = PersistentAudioCache(str(tmp_path))
+    for name in ("first", "second", "third"):
+        cache.put(name, _cached_result(tmp_path, name))
+    
+    reloaded = PersistentAudioCache(str(tmp_path), max_size=2)
+    assert list(reloaded._entries) == ["second", "third"]
+    assert not (tmp_path / "first.mp3").exists()
+    # The trimmed manifest is written back, so the next run starts within budget too
+    assert len(json.loads((tmp_path / PersistentAudioCache.MANIFEST_NAME).read_text())) == 2
+
+
+def test_a_directory_in_use_by_another_process_is_refused(tmp_path):
+    pytest.importorskip("fcntl")
+    lock_path = tmp_path / PersistentAudioCache.LOCK_NAME
+    holder = subprocess.Popen([sys.executable, "-c", (
+        "import fcntl, sys\n"
+        f"f = open({str(lock_path)!r}, 'a+b')\n"
+        "fcntl.lockf(f, fcntl.LOCK_EX)\n"
+        "print('locked', flush=True)\n"
+        "sys.stdin.read()\n")], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        assert holder.stdout.readline().strip() == "locked"
+        with pytest.raises(OSError, match="another process"):
+            PersistentAudioCache(str(tmp_path))
+    finally:
+        holder.communicate("")
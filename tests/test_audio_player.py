@@ -0,0 +1,70 @@
+import asyncio
+
+import voice_storyteller_server as server
+from voice_storyteller_server import AudioPlayer
+
+
+async def test_multi_part_playback_preloads_a_window_ahead(monkeypatch):
+    monkeypatch.setattr(server, "AVFOUNDATION_AVAILABLE", True)
+    monkeypatch.setattr(server, "SOUNDDEVICE_AVAILABLE", False)
+    monkeypatch.setattr(AudioPlayer, "_prepared", server.OrderedDict())
+    files = [f"part_{i}.mp3" for i in range(12)]
+    prepared = []
+    preloaded_when_played = {}
+    
+    def _prepare(audio_file):
+        prepared.append(audio_file)
+        AudioPlayer._prepared[audio_file] = object()
+        return True
+    
+    async def _play(audio_file):
+        # Let lookahead loads started for this file reach the playback threads
+        await asyncio.sleep(0.01)
+        preloaded_when_played[audio_file] = len(prepared)
+        return True
+    
+    monkeypatch.setattr(AudioPlayer, "prepare", staticmethod(_prepare))
+    monkeypatch.setattr(AudioPlayer, "play_audio_file_async", staticmethod(_play))
+    
+    assert await AudioPlayer.play_audio_files_async(files)
+    
+    for index, audio_file in enumerate(files):
+        # Never more than the window beyond the file playing, so the LRU keeps what is about to play
+        assert preloaded_when_played[audio_file] <= index + AudioPlayer.PREPARE_AHEAD
+    # Each file is decoded once, however often playback and lookahead ask for it
+    assert sorted(prepared) == sorted(files[1:])
+
+
+async def test_sounddevice_is_not_retried_after_it_fails(monkeypatch, tmp_path):
+    monkeypatch.setattr(server, "SOUNDDEVICE_AVAILABLE", True)
+    monkeypatch.setattr(server, "SYSTEM", "Linux")
+    monkeypatch.setattr(server, "INSTALLED_LINUX_PLAYERS", ())
+    monkeypatch.setattr(AudioPlayer, "_sounddevice_disabled", False)
+    attempts = []
+    
+    def _play(source, audio_format=None):
+        attempts.append(source)
+        AudioPlayer._disable_sounddevice(OSError("no output device"))
+        return False
+    
+    async def _xdg_open(*command, **kwargs):
+        class _Done:
+            async def wait(self):
+                return 0
+        return _Done()
+    
+    monkeypatch.setattr(AudioPlayer, "_play_with_sounddevice", staticmethod(_play))
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", _xdg_open)
+    audio_file = tmp_path / "story.mp3"
+    audio_file.write_bytes(b"ID3")
+    
+    assert await AudioPlayer.play_audio_file_async(str(audio_file))
+    assert await AudioPlayer.play_audio_file_async(str(audio_file))
+    assert len(attempts) == 1
+
+
+def test_no_avaudioplayer_preload_while_sounddevice_plays(monkeypatch):
+    monkeypatch.setattr(server, "AVFOUNDATION_AVAILABLE", True)
+    monkeypatch.setattr(server, "SOUNDDEVICE_AVAILABLE", True)
+    monkeypatch.setattr(AudioPlayer, "_sounddevice_disabled", False)
+    assert AudioPlayer.prepare_soon("story.mp3") is None
@@ -0,0 +1,31 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+import voice_storyteller_client as client
+
+
+async def test_ainput_reads_lines_and_survives_an_abandoned_prompt(monkeypatch):
+    read_fd, write_fd = os.pipe()
+    with os.fdopen(read_fd, "r") as stdin:
+        monkeypatch.setattr(sys, "stdin", stdin)
+        monkeypatch.setattr(client, "_stdin_buffer", bytearray())
+        
+        os.write(write_fd, b"first\nsecond\n")
+        assert await client.ainput() == "first"
+        assert await client.ainput() == "second"
+        
+        # A cancelled prompt must not swallow the next line
+        pending = asyncio.ensure_future(client.ainput())
+        await asyncio.sleep(0.05)
+        pending.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await pending
+        os.write(write_fd, b"third\n")
+        assert await client.ainput() == "third"
+        
+        os.close(write_fd)
+        with pytest.raises(EOFError):
+            await client.ainput()
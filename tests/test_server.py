@@ -0,0 +1,236 @@
+import asyncio
+import json
+
+import pytest
+
+from voice_storyteller_server import EnhancedMCPServer
+
+
+async def test_create_builds_server_on_running_loop():
+    server = await EnhancedMCPServer.create()
+    try:
+        response = await server.handle_request({"method": "tools/call", "params": {
+            "name": "generate_story", "arguments": {"moral": "kindness"}}})
+        assert "content" in response
+        # The engine's asyncio primitives must be usable from the loop that built the server
+        async with server.voice_engine._synth_semaphore:
+            pass
+    finally:
+        await server.voice_engine.close()
+
+
+class _StreamingPipeline:
+    """Story pipeline stand-in that streams fixed sentences with a pause between them."""
+    
+    SENTENCES = ["Mia found a lost kitten.", "She carried it home in the rain."]
+    
+    async def generate_story(self, moral, length, on_sentence=None):
+        for sentence in self.SENTENCES:
+            await asyncio.sleep(0.05)
+            if on_sentence:
+                on_sentence(sentence)
+        return {"content": " ".join(self.SENTENCES), "moral": moral}
+
+
+async def test_stream_story_sends_text_ahead_of_audio_and_audio_in_order():
+    server = EnhancedMCPServer(pipeline=_StreamingPipeline())
+    # The first sentence takes much longer to narrate than the second
+    delays = {_StreamingPipeline.SENTENCES[0]: 0.3, _StreamingPipeline.SENTENCES[1]: 0.01}
+    
+    async def _narrate(text, voice_id, save_file=True):
+        await asyncio.sleep(delays[text])
+        return {"success": True, "audio_file": text}
+    
+    server.voice_engine.narrate_story = _narrate
+    events = []
+    async for notification in server.handle_stream({"method": "tools/call", "params": {
+            "name": "generate_story_stream", "arguments": {"moral": "kindness", "voice_id": "edge_jenny"}}}):
+        params = notification.get("params", {})
+        events.append((notification["method"], params.get("text") or params.get("audio_file")))
+    
+    first, second = _StreamingPipeline.SENTENCES
+    assert events[:4] == [("story/delta", first), ("story/delta", second),
+                          ("story/voice_ready", first), ("story/voice_ready", second)]
+    assert events[-1][0] == "story/end"
+
+
+async def test_unpolled_background_narrations_expire(monkeypatch):
+    import voice_storyteller_server as server_module
+    monkeypatch.setattr(server_module, "NARRATION_RESULT_TTL", 0.05)
+    server = EnhancedMCPServer()
+    
+    async def _narrate(text, voice_id, save_file=True):
+        return {"success": True, "audio_file": "story.mp3"}
+    
+    server.voice_engine.narrate_story = _narrate
+    response = await server.handle_request({"method": "tools/call", "params": {
+        "name": "generate_story", "arguments": {"moral": "kindness", "narrate": True,
+                                                "voice_id": "edge_jenny", "background_narration": True}}})
+    assert "content" in response
+    assert len(server._narration_tasks) == 1
+    
+    await asyncio.sleep(0.2)
+    assert server._narration_tasks == {}
+
+
+async def test_narrate_text_can_play_through_the_streaming_path():
+    server = EnhancedMCPServer()
+    calls = []
+    
+    async def _narrate(text, voice_id, save_file=True):
+        calls.append(save_file)
+        return {"success": True, "audio_file": "story.mp3" if save_file else None}
+    
+    server.voice_engine.narrate_story = _narrate
+    try:
+        for play in (True, False):
+            response = await server.handle_request({"method": "tools/call", "params": {
+                "name": "narrate_text", "arguments": {"text": "Hello there.", "play": play}}})
+            assert "content" in response
+    finally:
+        await server.voice_engine.close()
+    
+    # Playing goes through narrate_and_play_streaming, which never saves a file
+    assert calls == [False, True]
+
+
+class _ConcurrentClaude:
+    """Claude stand-in that answers every moral but one."""
+    
+    available = True
+    
+    async def generate_stories(self, morals, target_length, story_type="adventure"):
+        return [None if moral == "patience" else f"A story about {moral}." for moral in morals]
+
+
+class _ClaudePipeline:
+    claude = _ConcurrentClaude()
+
+
+async def test_pregenerate_story_set_can_generate_immediately():
+    server = EnhancedMCPServer(pipeline=_ClaudePipeline())
+    try:
+        response = await server.handle_request({"method": "tools/call", "params": {
+            "name": "pregenerate_story_set",
+            "arguments": {"morals": ["kindness", "patience"], "immediate": True}}})
+    finally:
+        await server.voice_engine.close()
+    
+    result = json.loads(response["content"][0]["text"])
+    assert result["status"] == "generated" and result["stories"] == 1
+    assert result["content"] == {"kindness": "A story about kindness."}
+    assert result["failed"] == ["patience"]
+
+
+async def test_background_narration_returns_before_the_connection_is_ready():
+    server = EnhancedMCPServer()
+    ready = asyncio.Event()
+    narrated = []
+    
+    async def _prepare(voice_id):
+        await ready.wait()
+        return True
+    
+    async def _narrate(text, voice_id, save_file=True):
+        narrated.append(text)
+        return {"success": True, "audio_file": "story.mp3"}
+    
+    server.voice_engine.prepare = _prepare
+    server.voice_engine.narrate_story = _narrate
+    try:
+        response = await asyncio.wait_for(server.handle_request({"method": "tools/call", "params": {
+            "name": "generate_story", "arguments": {"moral": "kindness", "narrate": True,
+                                                    "voice_id": "gtts_storyteller",
+                                                    "background_narration": True}}}), 1)
+        assert "content" in response and narrated == []
+        
+        ready.set()
+        await asyncio.gather(*server._narration_tasks.values())
+        assert len(narrated) == 1
+    finally:
+        await server.voice_engine.close()
+
+
+class _ReplacedDraftPipeline(_StreamingPipeline):
+    """Story pipeline stand-in whose streamed draft loses to a fallback story."""
+    
+    FALLBACK = "A fallback story about sharing."
+    
+    async def generate_story(self, moral, length, on_sentence=None):
+        await super().generate_story(moral, length, on_sentence)
+        await asyncio.sleep(0.1)
+        return {"content": self.FALLBACK, "moral": moral}
+
+
+async def test_stream_story_resets_audio_when_the_draft_is_replaced():
+    server = EnhancedMCPServer(pipeline=_ReplacedDraftPipeline())
+    
+    async def _narrate(text, voice_id, save_file=True):
+        return {"success": True, "audio_file": text}
+    
+    async def _narrate_stream(text, voice_id):
+        yield {"success": True, "audio_file": text}
+    
+    server.voice_engine.narrate_story = _narrate
+    server.voice_engine.narrate_stream = _narrate_stream
+    methods = []
+    audio = []
+    async for notification in server.handle_stream({"method": "tools/call", "params": {
+            "name": "generate_story_stream", "arguments": {"moral": "kindness", "voice_id": "edge_jenny"}}}):
+        methods.append(notification["method"])
+        if notification["method"] == "story/reset":
+            audio.clear()
+        elif notification["method"] == "story/voice_ready":
+            audio.append(notification["params"]["audio_file"])
+    
+    assert "story/reset" in methods
+    assert methods.index("story/reset") > methods.index("story/voice_ready")
+    # Only the fallback's narration survives the reset
+    assert audio == [_ReplacedDraftPipeline.FALLBACK]
+    assert methods[-1] == "story/end"
+
+
+@pytest.mark.parametrize("morals", ["kind", [""], ["kindness", 7], ["kindness"] * 51])
+async def test_pregenerate_story_set_rejects_malformed_morals(morals):
+    server = EnhancedMCPServer(pipeline=_ClaudePipeline())
+    try:
+        response = await server.handle_request({"method": "tools/call", "params": {
+            "name": "pregenerate_story_set", "arguments": {"morals": morals, "immediate": True}}})
+    finally:
+        await server.voice_engine.close()
+    
+    assert "morals" in response["error"].lower()
+
+
+@pytest.mark.parametrize("moral", [123, ["kindness"], "   "])
+async def test_story_tools_reject_a_moral_that_is_not_text(moral):
+    server = EnhancedMCPServer()
+    request = {"method": "tools/call", "params": {"name": "generate_story", "arguments": {"moral": moral}}}
+    try:
+        response = await server.handle_request(request)
+        request["params"]["name"] = "generate_story_stream"
+        notifications = [notification async for notification in server.handle_stream(request)]
+    finally:
+        await server.voice_engine.close()
+    
+    assert response["error"].startswith("Invalid moral")
+    assert notifications[-1]["params"]["error"].startswith("Invalid moral")
+
+
+async def test_story_cache_saves_are_coalesced_off_the_loop(monkeypatch):
+    import threading
+    from voice_storyteller_server import ClaudeStoryGenerator
+    generator = ClaudeStoryGenerator()
+    writes = []
+    
+    def _write(entries):
+        writes.append((threading.current_thread() is threading.main_thread(), len(entries)))
+    
+    monkeypatch.setattr(generator, "_write_story_cache", _write)
+    for moral in ("kindness", "honesty"):
+        generator._cache_story((moral, 75, "adventure"), f"A story about {moral}.")
+        generator._save_story_cache()
+    assert writes == []
+    
+    await generator.flush()
+    assert writes == [(False, 2)]
@@ -0,0 +1,190 @@
+import pytest
+
+from voice_storyteller_server import GTTS_TIMEOUT, VoiceNarrationEngine
+
+
+async def test_gtts_falls_back_to_library_save_when_internals_change(monkeypatch, tmp_path):
+    gtts = pytest.importorskip("gtts")
+    pytest.importorskip("aiohttp")
+    engine = VoiceNarrationEngine()
+    
+    async def _fetch(tts, audio_file):
+        raise AttributeError("'gTTS' object has no attribute '_package_rpc'")
+    
+    saved = []
+    
+    def _save(tts, audio_file):
+        saved.append(tts.timeout)
+        with open(audio_file, "wb") as f:
+            f.write(b"ID3")
+    
+    monkeypatch.setattr(engine, "_fetch_gtts_audio", _fetch)
+    monkeypatch.setattr(gtts.gTTS, "save", _save)
+    audio_file = str(tmp_path / "story.mp3")
+    try:
+        result = await engine._narrate_gtts("Hello there.", engine.voice_profiles["gtts_storyteller"],
+                                            True, audio_file)
+    finally:
+        await engine.close()
+    
+    assert result["success"] and result["audio_file"] == audio_file
+    # Requests through gTTS get a finite timeout too
+    assert saved == [GTTS_TIMEOUT]
+    assert not engine._gtts_rpc_supported
+
+
+async def test_gtts_warm_up_leaves_a_reusable_connection(monkeypatch):
+    web = pytest.importorskip("aiohttp.web")
+    import voice_storyteller_server as server
+    
+    client_ports = []
+    
+    async def _record(request):
+        client_ports.append(request.transport.get_extra_info("peername")[1])
+        return web.Response(text="ok")
+    
+    app = web.Application()
+    app.router.add_route("*", "/batch", _record)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    monkeypatch.setattr(server, "GTTS_URL", f"http://127.0.0.1:{port}/batch")
+    
+    engine = VoiceNarrationEngine()
+    try:
+        assert await engine._open_gtts_connection()
+        async with engine._get_http_session().post(server.GTTS_URL) as response:
+            await response.text()
+    finally:
+        await engine.close()
+        await runner.cleanup()
+    
+    # The narration request went out over the connection the warm-up opened
+    assert len(client_ports) == 2 and client_ports[0] == client_ports[1]
+
+
+async def test_prepare_only_opens_connections_for_gtts_voices(monkeypatch):
+    engine = VoiceNarrationEngine()
+    opened = []
+    
+    async def _open():
+        opened.append(True)
+        return True
+    
+    monkeypatch.setattr(engine, "_open_gtts_connection", _open)
+    try:
+        assert not await engine.prepare("edge_jenny")
+        assert not await engine.prepare("no_such_voice")
+        if engine._can_pool_gtts():
+            assert await engine.prepare("gtts_storyteller")
+    finally:
+        await engine.close()
+    assert len(opened) == (1 if engine._can_pool_gtts() else 0)
+
+
+async def test_play_only_narration_releases_synthesis_slot_before_playing(monkeypatch):
+    import voice_storyteller_server as server
+    engine = VoiceNarrationEngine()
+    if "gtts_storyteller" not in engine.voice_profiles:
+        await engine.close()
+        pytest.skip("gTTS is not installed")
+    free_slots_during_playback = []
+    
+    async def _playback():
+        free_slots_during_playback.append(engine._synth_semaphore._value)
+        return True
+    
+    async def _narrate(text, profile, save_file, audio_file):
+        with open(audio_file, "wb") as f:
+            f.write(b"ID3")
+        return {"success": True, "engine": "gtts", "audio_file": None, "_playback": _playback}
+    
+    monkeypatch.setattr(engine, "_narrate_gtts", _narrate)
+    try:
+        result = await engine.narrate_story("Playback slot check.", "gtts_storyteller", save_file=False)
+    finally:
+        await engine.close()
+    
+    assert result["success"] and "_playback" not in result
+    assert free_slots_during_playback == [server.SYNTH_CONCURRENCY]
+
+
+async def test_identical_narrations_share_one_synthesis(monkeypatch):
+    import asyncio
+    engine = VoiceNarrationEngine()
+    if "gtts_storyteller" not in engine.voice_profiles:
+        await engine.close()
+        pytest.skip("gTTS is not installed")
+    synthesized = []
+    
+    async def _narrate(text, profile, save_file, audio_file):
+        synthesized.append(text)
+        await asyncio.sleep(0.05)
+        with open(audio_file, "wb") as f:
+            f.write(b"ID3")
+        return {"success": True, "engine": "gtts", "audio_file": audio_file}
+    
+    monkeypatch.setattr(engine, "_narrate_gtts", _narrate)
+    text = "One synthesis for everyone."
+    try:
+        results = await asyncio.gather(*[
+            engine.narrate_story(text, "gtts_storyteller", save_file=True) for _ in range(3)
+        ])
+        # A later request is a cache hit rather than a fresh synthesis
+        cached = await engine.narrate_story(text, "gtts_storyteller", save_file=True)
+    finally:
+        await engine.close()
+    
+    assert synthesized == [text]
+    assert all(result["success"] for result in results)
+    assert len({result["audio_file"] for result in results + [cached]}) == 1
+    assert cached["cache_hit"]
+
+
+async def test_merged_mp3_narrations_join_into_one_file(tmp_path):
+    engine = VoiceNarrationEngine()
+    if "gtts_storyteller" not in engine.voice_profiles:
+        await engine.close()
+        pytest.skip("gTTS is not installed")
+    results = []
+    for index, data in enumerate((b"first", b"second")):
+        audio_file = tmp_path / f"part{index}.mp3"
+        audio_file.write_bytes(data)
+        results.append({"success": True, "engine": "gtts", "audio_file": str(audio_file),
+                        "duration_estimate": 1.0})
+    try:
+        merged = await engine.merge_narrations(results, "First. Second.", "gtts_storyteller")
+    finally:
+        await engine.close()
+    
+    with open(merged["audio_file"], "rb") as f:
+        assert f.read() == b"firstsecond"
+    assert merged["audio_files"] == [result["audio_file"] for result in results]
+    assert merged["duration_estimate"] == 2.0 and merged["chunks"] == 2
+
+
+async def test_merged_wav_narrations_only_list_their_files(tmp_path):
+    engine = VoiceNarrationEngine()
+    results = [{"success": True, "engine": "pyttsx3", "audio_file": str(tmp_path / f"part{index}.wav")}
+               for index in range(2)]
+    try:
+        merged = await engine.merge_narrations(results, "First. Second.")
+    finally:
+        await engine.close()
+    
+    assert merged["audio_file"] is None
+    assert merged["audio_files"] == [result["audio_file"] for result in results]
+
+
+@pytest.mark.parametrize("value, expected", [("3", 3), ("0", 1), ("lots", None), (None, None)])
+def test_synth_concurrency_setting_falls_back_when_invalid(monkeypatch, value, expected):
+    import os
+    import voice_storyteller_server as server
+    if value is None:
+        monkeypatch.delenv("HIKAYA_SYNTH_CONCURRENCY", raising=False)
+    else:
+        monkeypatch.setenv("HIKAYA_SYNTH_CONCURRENCY", value)
+    default = max(1, (os.cpu_count() or 1) // 4)
+    assert server._synth_concurrency() == (default if expected is None else expected)
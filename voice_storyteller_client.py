@@ -5,17 +5,132 @@ Fixed for macOS - no more Music app launching!
 """
 
 import asyncio
-import json
 import logging
 import os
-from typing import Dict, Any, Optional
-import subprocess
-import platform
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+import shutil
+import sys
+import threading
+
+from voice_storyteller_server import (EnhancedMCPServer, loads_json, install_event_loop,
+                                      voice_engines, INSTALLED_LINUX_PLAYERS, SYSTEM)
+# Playback is shared with the server so both sides pick players the same way
+from voice_storyteller_server import AudioPlayer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Emoji shown next to voices in listings
+ENGINE_EMOJIS = {"pyttsx3": "🖥️", "gtts": "🌍", "edge_tts": "🎭"}
+STYLE_EMOJIS = {"storyteller": "📚", "parent": "👨‍👩‍👧‍👦", "child": "👶", "friendly": "😊"}
+GENDER_EMOJIS = {"male": "♂️", "female": "♀️"}
+METHOD_EMOJIS = {"claude": "🤖", "hybrid": "🔥", "template": "📚"}
+
+# Fixed pieces of the story display
+BANNER_RULE = "=" * 70
+STORY_RULE = "-" * 50
+PROMPT_RULE = "\n" + "=" * 60
+LENGTH_MENU = "\n".join((
+    "\n📊 Story Length Options:",
+    "   1. Short (50 words) - Quick lesson",
+    "   2. Medium (75 words) - Balanced story [Recommended]",
+    "   3. Long (100 words) - Detailed narrative",
+    "   4. Custom length"
+))
+STORY_HEADER = (
+    BANNER_RULE,
+    "🌟 AI-POWERED KIDS STORYTELLER WITH VOICE NARRATION 🌟",
+    "🍎 macOS Compatible - No Music App Interference!",
+    BANNER_RULE,
+    ""
+)
+METHOD_DESCRIPTIONS = {
+    "claude": "🤖 Fully AI-Generated by Claude",
+    "hybrid": "🔥 Template Enhanced with Claude AI",
+    "template": "📚 Template-Based Generation"
+}
+
+# Bytes read from stdin past the end of the line last returned by ainput
+_stdin_buffer = bytearray()
+
+def _pop_stdin_line(at_eof: bool = False) -> Optional[str]:
+    """Take the next complete line from the stdin buffer, or the remainder once stdin has closed."""
+    end = _stdin_buffer.find(b"\n")
+    if end < 0:
+        if not at_eof or not _stdin_buffer:
+            return None
+        end = len(_stdin_buffer)
+    raw = bytes(_stdin_buffer[:end])
+    del _stdin_buffer[:end + 1]
+    return raw.decode(sys.stdin.encoding or "utf-8", errors="replace").rstrip("\r")
+
+def _read_stdin(fd: int, line: "asyncio.Future"):
+    """Reader callback: read what stdin has ready and resolve the prompt once a line is complete."""
+    if line.done():
+        return
+    try:
+        chunk = os.read(fd, 4096)
+    except BlockingIOError:
+        return
+    except OSError as e:
+        line.set_exception(e)
+        return
+    _stdin_buffer.extend(chunk)
+    result = _pop_stdin_line(at_eof=not chunk)
+    if result is not None:
+        line.set_result(result)
+    elif not chunk:
+        line.set_exception(EOFError())
+
+async def ainput(prompt: str = "") -> str:
+    """Read a line from stdin without blocking the event loop."""
+    print(prompt, end="", flush=True)
+    buffered = _pop_stdin_line()
+    if buffered is not None:
+        return buffered
+    
+    loop = asyncio.get_running_loop()
+    line = loop.create_future()
+    try:
+        fd = sys.stdin.fileno()
+        # Watch the descriptor from the loop itself, so no thread is left blocked reading stdin at exit
+        loop.add_reader(fd, _read_stdin, fd, line)
+    except (AttributeError, ValueError, OSError, NotImplementedError):
+        # Windows loops and regular files cannot be watched; reading them on a thread is the fallback
+        return await _ainput_on_thread(loop)
+    try:
+        return await line
+    finally:
+        loop.remove_reader(fd)
+
+async def _ainput_on_thread(loop: asyncio.AbstractEventLoop) -> str:
+    """Read a line with input() on a daemon thread, ignoring the result if the prompt was abandoned."""
+    line = loop.create_future()
+    
+    def _resolve(result: str):
+        if not line.done():
+            line.set_result(result)
+    
+    def _fail(error: BaseException):
+        if not line.done():
+            line.set_exception(error)
+    
+    def _read():
+        try:
+            result = input()
+        except BaseException as e:
+            outcome = (_fail, e)
+        else:
+            outcome = (_resolve, result)
+        try:
+            loop.call_soon_threadsafe(*outcome)
+        except RuntimeError:
+            pass  # The loop has already closed
+    
+    threading.Thread(target=_read, daemon=True).start()
+    return await line
+
 class MCPClient:
     """Enhanced MCP Client for Claude-powered storyteller with voice."""
     
@@ -23,12 +138,17 @@ class MCPClient:
         self.server_host = server_host
         self.server_port = server_port
         self.connected = False
+        # Built once on connect and reused by every request
+        self._server: Optional[EnhancedMCPServer] = None
+        # The server's request handler, bound once on connect
+        self._handle = None
     
     async def connect(self) -> bool:
         """Connect to the enhanced MCP server."""
         try:
             logger.info(f"🔗 Connecting to Enhanced Voice-Enabled MCP server at {self.server_host}:{self.server_port}")
-            await asyncio.sleep(0.1)  # Simulate connection delay
+            self._server = await EnhancedMCPServer.create()
+            self._handle = self._server.handle_request
             self.connected = True
             logger.info("✅ Successfully connected to enhanced voice server")
             return True
@@ -40,6 +160,9 @@ class MCPClient:
         """Disconnect from the MCP server."""
         if self.connected:
             logger.info("🔌 Disconnecting from MCP server")
+            await self._server.close()
+            self._server = None
+            self._handle = None
             self.connected = False
     
     async def list_tools(self) -> Dict[str, Any]:
@@ -49,9 +172,7 @@ class MCPClient:
         
         request = {"method": "tools/list"}
         
-        from voice_storyteller_server import EnhancedMCPServer
-        server = EnhancedMCPServer()
-        response = await server.handle_request(request)
+        response = await self._handle(request)
         
         return response
     
@@ -68,12 +189,49 @@ class MCPClient:
             }
         }
         
-        from voice_storyteller_server import EnhancedMCPServer
-        server = EnhancedMCPServer()
-        response = await server.handle_request(request)
+        response = await self._handle(request)
         
         return response
     
+    async def call_tools_batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Call several tools in one batch, returning their responses in call order."""
+        if not self.connected:
+            raise ConnectionError("Not connected to server")
+        
+        requests = [
+            {"jsonrpc": "2.0", "id": i, "method": "tools/call",
+             "params": {"name": tool_name, "arguments": arguments}}
+            for i, (tool_name, arguments) in enumerate(calls)
+        ]
+        return await self._server.handle_batch(requests)
+    
+    async def stream_tool(self, tool_name: str, arguments: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Call a streaming tool, yielding its notifications as the server sends them."""
+        if not self.connected:
+            raise ConnectionError("Not connected to server")
+        
+        request = {
+            "method": "tools/call",
+            "params": {
+                "name": tool_name,
+                "arguments": arguments
+            }
+        }
+        
+        async for notification in self._server.handle_stream(request):
+            yield notification
+    
+    @staticmethod
+    def tool_result(response: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Decode the JSON payload of a tool response, or None on error."""
+        if "error" in response:
+            logger.error(f"❌ Server returned error: {response['error']}")
+            return None
+        content = response.get("content", [])
+        if content:
+            return loads_json(content[0]["text"])
+        return None
+    
     async def generate_story(self, moral: str, length: int = 75, voice_id: Optional[str] = None, 
                            narrate: bool = False) -> Optional[Dict[str, Any]]:
         """Generate a story with optional voice narration."""
@@ -95,14 +253,9 @@ class MCPClient:
             
             content = response.get("content", [])
             if content and len(content) > 0:
-                story_data = json.loads(content[0]["text"])
-                method_emoji = {
-                    "claude": "🤖",
-                    "hybrid": "🔥", 
-                    "template": "📚"
-                }
+                story_data = loads_json(content[0]["text"])
                 method = story_data.get('generation_method', 'template')
-                emoji = method_emoji.get(method, "📖")
+                emoji = METHOD_EMOJIS.get(method, "📖")
                 
                 logger.info(f"✅ Received story: '{story_data.get('title', 'Untitled')}' {emoji} ({method})")
                 
@@ -133,7 +286,7 @@ class MCPClient:
             
             content = response.get("content", [])
             if content and len(content) > 0:
-                return json.loads(content[0]["text"])
+                return loads_json(content[0]["text"])
             
             return None
             
@@ -141,14 +294,16 @@ class MCPClient:
             logger.error(f"❌ Error listing voices: {e}")
             return None
     
-    async def narrate_text(self, text: str, voice_id: str = "default_narrator") -> Optional[Dict[str, Any]]:
-        """Narrate arbitrary text with specified voice."""
+    async def narrate_text(self, text: str, voice_id: str = "default_narrator",
+                           play: bool = False) -> Optional[Dict[str, Any]]:
+        """Narrate arbitrary text with specified voice, optionally playing it right away."""
         try:
             logger.info(f"🎙️ Narrating text with voice: {voice_id}")
             
             response = await self.call_tool("narrate_text", {
                 "text": text,
-                "voice_id": voice_id
+                "voice_id": voice_id,
+                "play": play
             })
             
             if "error" in response:
@@ -157,7 +312,7 @@ class MCPClient:
             
             content = response.get("content", [])
             if content and len(content) > 0:
-                return json.loads(content[0]["text"])
+                return loads_json(content[0]["text"])
             
             return None
             
@@ -165,65 +320,6 @@ class MCPClient:
             logger.error(f"❌ Error narrating text: {e}")
             return None
 
-class AudioPlayer:
-    """Cross-platform audio player that avoids Music app on macOS."""
-    
-    @staticmethod
-    def play_audio_file(audio_file: str) -> bool:
-        """Play audio file using system-appropriate method."""
-        if not audio_file or not os.path.exists(audio_file):
-            print("❌ Audio file not found")
-            return False
-        
-        try:
-            system = platform.system()
-            
-            if system == "Darwin":  # macOS
-                # Use afplay instead of open to avoid Music app
-                result = subprocess.run(["afplay", audio_file], check=True,
-                                      capture_output=True, text=True)
-                print("✅ Playing with afplay (macOS native - no Music app!)")
-                return True
-                
-            elif system == "Linux":
-                # Try multiple players in order of preference
-                players = ["paplay", "aplay", "play", "mpg123", "ffplay"]
-                for player in players:
-                    try:
-                        subprocess.run([player, audio_file], check=True, 
-                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                        print(f"✅ Playing with {player}")
-                        return True
-                    except (subprocess.CalledProcessError, FileNotFoundError):
-                        continue
-                
-                # Fallback to xdg-open
-                subprocess.run(["xdg-open", audio_file])
-                return True
-                
-            elif system == "Windows":
-                # Use Windows Media Player command line
-                subprocess.run(["start", "/wait", "", audio_file], shell=True)
-                return True
-                
-            else:
-                print(f"⚠️ Unknown system: {system}")
-                return False
-                
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Audio playback failed: {e}")
-            return False
-        except FileNotFoundError:
-            if system == "Darwin":
-                print("❌ afplay not found. This should be available on all macOS systems.")
-                print("💡 Try: which afplay")
-            else:
-                print(f"❌ No audio player found for {system}")
-            return False
-        except Exception as e:
-            print(f"❌ Unexpected audio error: {e}")
-            return False
-
 class EnhancedVoiceStorytellerClient:
     """Enhanced high-level client with voice narration capabilities - macOS compatible."""
     
@@ -232,7 +328,11 @@ class EnhancedVoiceStorytellerClient:
         self.audio_player = AudioPlayer()
         self.claude_available = False
         self.available_voices = {}
+        self._voices_display = "❌ No voices available"
+        self._voice_options = []
+        self._voice_menu = ""
         self.last_audio_file = None
+        self.last_audio_files = []
     
     async def start(self):
         """Initialize the enhanced client with voice capabilities."""
@@ -240,19 +340,32 @@ class EnhancedVoiceStorytellerClient:
         if not success:
             raise ConnectionError("Failed to connect to enhanced storyteller server")
         
-        # Get available voices
-        self.available_voices = await self.mcp_client.list_voices()
+        # Get available voices and check Claude availability in one batch
+        try:
+            voices_response, capabilities_response = await self.mcp_client.call_tools_batch([
+                ("list_voices", {}),
+                ("get_capabilities", {})
+            ])
+        except Exception as e:
+            logger.error(f"❌ Error querying server capabilities: {e}")
+            return
+        
+        self.available_voices = self.mcp_client.tool_result(voices_response) or {}
+        # The voice list is fixed for the session, so format and flatten it once
+        self._voices_display = self._format_voices_display()
+        self._voice_options = [voice for engine_voices in self.available_voices.values()
+                               for voice in engine_voices if voice.get('available')]
+        self._voice_menu = "\n".join(["\n🎙️ Choose a voice:", "   0. Default narrator"] + [
+            f"   {i}. {ENGINE_EMOJIS.get(voice.get('engine', ''), '🎵')} {voice['name']}"
+            for i, voice in enumerate(self._voice_options, 1)
+        ])
         if self.available_voices:
             voice_count = sum(len(voices) for voices in self.available_voices.values())
             logger.info(f"🎵 Found {voice_count} available voices across multiple engines")
         
-        # Check Claude availability
-        try:
-            test_story = await self.mcp_client.generate_story("test", 30)
-            if test_story:
-                self.claude_available = test_story.get("claude_available", False)
-        except Exception:
-            pass
+        capabilities = self.mcp_client.tool_result(capabilities_response)
+        if capabilities:
+            self.claude_available = capabilities.get("claude_available", False)
     
     async def stop(self):
         """Clean up and disconnect."""
@@ -264,30 +377,16 @@ class EnhancedVoiceStorytellerClient:
             return "❌ No voices available"
         
         output = []
-        engine_emojis = {
-            "pyttsx3": "🖥️",
-            "gtts": "🌍",
-            "edge_tts": "🎭"
-        }
         
         for engine, voices in self.available_voices.items():
             available_voices = [v for v in voices if v['available']]
             if available_voices:
-                emoji = engine_emojis.get(engine, "🎵")
+                emoji = ENGINE_EMOJIS.get(engine, "🎵")
                 output.append(f"\n{emoji} {engine.upper()} ({len(available_voices)} voices):")
                 
                 for i, voice in enumerate(available_voices, 1):
-                    style_emoji = {
-                        "storyteller": "📚",
-                        "parent": "👨‍👩‍👧‍👦",
-                        "child": "👶",
-                        "friendly": "😊"
-                    }.get(voice['style'], "🎙️")
-                    
-                    gender_emoji = {
-                        "male": "♂️",
-                        "female": "♀️"
-                    }.get(voice['gender'], "")
+                    style_emoji = STYLE_EMOJIS.get(voice['style'], "🎙️")
+                    gender_emoji = GENDER_EMOJIS.get(voice['gender'], "")
                     
                     output.append(f"   {i}. {style_emoji} {voice['name']} {gender_emoji}")
                     output.append(f"      ID: {voice['id']} | Style: {voice['style']}")
@@ -303,30 +402,22 @@ class EnhancedVoiceStorytellerClient:
             return "❌ Failed to generate story. Please try again."
         
         # Enhanced formatting with voice indicators
-        output = []
-        output.append("=" * 70)
-        output.append("🌟 AI-POWERED KIDS STORYTELLER WITH VOICE NARRATION 🌟")
-        output.append("🍎 macOS Compatible - No Music App Interference!")
-        output.append("=" * 70)
-        output.append("")
+        output = list(STORY_HEADER)
         
         # Story metadata
-        method_info = {
-            "claude": "🤖 Fully AI-Generated by Claude",
-            "hybrid": "🔥 Template Enhanced with Claude AI", 
-            "template": "📚 Template-Based Generation"
-        }
-        
         generation_method = story_data.get('generation_method', 'template')
-        method_description = method_info.get(generation_method, "📖 Unknown Method")
-        
-        output.append(f"📚 Title: {story_data['title']}")
-        output.append(f"💛 Moral: {story_data['moral'].title()}")
-        output.append(f"📊 Length: {story_data['length']} words")
-        output.append(f"🤖 Created by: {story_data['agent_id'].replace('_', ' ').title()}")
-        output.append(f"⚡ Generation: {method_description}")
-        output.append(f"⭐ Quality Score: {story_data['score']:.2f}/1.00")
-        output.append(f"🧠 AI Status: {'🟢 Claude Active' if story_data.get('claude_available') else '🟡 Template Mode'}")
+        method_description = METHOD_DESCRIPTIONS.get(generation_method, "📖 Unknown Method")
+        claude_active = story_data.get('claude_available')
+        
+        output.extend((
+            f"📚 Title: {story_data['title']}",
+            f"💛 Moral: {story_data['moral'].title()}",
+            f"📊 Length: {story_data['length']} words",
+            f"🤖 Created by: {story_data['agent_id'].replace('_', ' ').title()}",
+            f"⚡ Generation: {method_description}",
+            f"⭐ Quality Score: {story_data['score']:.2f}/1.00",
+            f"🧠 AI Status: {'🟢 Claude Active' if claude_active else '🟡 Template Mode'}"
+        ))
         
         # Voice narration info
         voice_narration = story_data.get("voice_narration")
@@ -341,8 +432,16 @@ class EnhancedVoiceStorytellerClient:
                 output.append(f"⏱️ Duration: ~{duration:.1f} seconds")
                 output.append(f"🖥️ System: {system_info}")
                 
-                if voice_narration.get("audio_file"):
-                    self.last_audio_file = voice_narration["audio_file"]
+                # Sentence-chunked WAV narrations cannot be joined and come back only as files in order
+                audio_files = ([voice_narration["audio_file"]] if voice_narration.get("audio_file")
+                               else voice_narration.get("audio_files") or [])
+                if audio_files:
+                    self.last_audio_file = audio_files[0]
+                    self.last_audio_files = audio_files
+                    # Start loading the opening files now so 'play' starts without a delay;
+                    # later ones are loaded while the earlier ones play
+                    for audio_file in self.last_audio_files[:AudioPlayer.PREPARE_AHEAD + 1]:
+                        self.audio_player.prepare_soon(audio_file)
                     if system_info == "Darwin":
                         output.append(f"🎵 Audio: Ready to play (afplay - no Music app!)")
                     else:
@@ -353,23 +452,22 @@ class EnhancedVoiceStorytellerClient:
         output.append("")
         
         output.append("📖 STORY:")
-        output.append("-" * 50)
+        output.append(STORY_RULE)
         
         # Format story for better readability
         story_content = story_data['content']
         if '. ' in story_content:
             sentences = story_content.split('. ')
-            formatted_content = ""
+            parts = []
             for i, sentence in enumerate(sentences):
-                formatted_content += sentence
+                parts.append(sentence)
                 if i < len(sentences) - 1:
-                    formatted_content += ". "
-                    if (i + 1) % 3 == 0:
-                        formatted_content += "\n\n"
-            story_content = formatted_content
+                    # Break into a new paragraph after every third sentence
+                    parts.append(". \n\n" if (i + 1) % 3 == 0 else ". ")
+            story_content = "".join(parts)
         
         output.append(story_content)
-        output.append("-" * 50)
+        output.append(STORY_RULE)
         output.append("")
         
         # Voice controls
@@ -377,50 +475,111 @@ class EnhancedVoiceStorytellerClient:
             output.append("🎵 VOICE CONTROLS:")
             output.append("   Type 'play' to hear the story")
             output.append("   Type 'replay' to play again")
-            if platform.system() == "Darwin":
+            if SYSTEM == "Darwin":
                 output.append("   ✅ Uses afplay (no Music app interference)")
             output.append("")
         
         # Enhanced details section
         if show_details:
             output.append("🔍 GENERATION DETAILS:")
-            output.append(f"AI Model: {'Claude 3.5 Sonnet' if story_data.get('claude_available') else 'Template System'}")
+            output.append(f"AI Model: {'Claude 3.5 Sonnet' if claude_active else 'Template System'}")
             output.append(f"Processing Method: {generation_method.title()}")
-            output.append(f"System: {platform.system()}")
+            output.append(f"System: {SYSTEM}")
             
             if self.available_voices:
                 output.append(f"Available Voice Engines: {', '.join(self.available_voices.keys())}")
             
             output.append("")
         
-        output.append("=" * 70)
+        output.append(BANNER_RULE)
         
         return "\n".join(output)
     
+    async def stream_story(self, moral: str, length: int = 75, voice_id: Optional[str] = None) -> bool:
+        """Print a story as it is written, playing each narrated sentence as soon as it is ready."""
+        audio_queue: asyncio.Queue = asyncio.Queue()
+        audio_files = []
+        
+        async def _play_in_order():
+            while (audio_file := await audio_queue.get()) is not None:
+                await self.audio_player.play_audio_file_async(audio_file)
+        
+        player = asyncio.create_task(_play_in_order())
+        story_data = None
+        deltas = []
+        print("📖 STORY:")
+        print(STORY_RULE)
+        try:
+            async for notification in self.mcp_client.stream_tool("generate_story_stream", {
+                "moral": moral,
+                "length": length,
+                "voice_id": voice_id
+            }):
+                method = notification.get("method")
+                params = notification.get("params", {})
+                if method == "story/delta":
+                    deltas.append(params["text"])
+                    print(params["text"], end=" ", flush=True)
+                elif method == "story/voice_ready":
+                    audio_files.append(params["audio_file"])
+                    audio_queue.put_nowait(params["audio_file"])
+                elif method == "story/reset":
+                    # The draft behind that audio was replaced; skip what has not played yet
+                    audio_files.clear()
+                    while not audio_queue.empty():
+                        audio_queue.get_nowait()
+                elif method == "story/end":
+                    story_data = params
+        finally:
+            audio_queue.put_nowait(None)
+            await player
+        print()
+        print(STORY_RULE)
+        
+        if not story_data or "error" in story_data:
+            print(f"❌ Failed to generate story: {(story_data or {}).get('error', 'no response')}")
+            return False
+        if " ".join(deltas).split() != story_data["content"].split():
+            # The streamed draft was replaced by a fallback story
+            print(story_data["content"])
+        print(f"📚 Title: {story_data['title']}")
+        
+        if audio_files:
+            self.last_audio_file = audio_files[0]
+            self.last_audio_files = audio_files
+        return True
+    
+    async def _play_last_narration(self, audio_files: Optional[List[str]] = None) -> bool:
+        """Play every audio file of the last narration in order, without blocking the event loop."""
+        return await self.audio_player.play_audio_files_async(
+            self.last_audio_files if audio_files is None else audio_files)
+    
     async def interactive_mode(self):
         """Enhanced interactive story generation session with voice."""
-        system = platform.system()
-        print("🌟 Welcome to the AI-Powered Voice Storyteller! 🌟")
-        print("Now enhanced with voice narration capabilities!")
+        system = SYSTEM
+        # Write the welcome screen in one go
+        intro = ["🌟 Welcome to the AI-Powered Voice Storyteller! 🌟",
+                 "Now enhanced with voice narration capabilities!"]
         
         if system == "Darwin":
-            print("🍎 macOS Compatible Version - No Music App Interference!")
+            intro.append("🍎 macOS Compatible Version - No Music App Interference!")
         
         if self.claude_available:
-            print("🤖 ✅ Claude AI is ACTIVE - Stories will be intelligently generated")
+            intro.append("🤖 ✅ Claude AI is ACTIVE - Stories will be intelligently generated")
         else:
-            print("📚 ⚠️ Running in Template Mode - Consider adding ANTHROPIC_API_KEY")
+            intro.append("📚 ⚠️ Running in Template Mode - Consider adding ANTHROPIC_API_KEY")
         
         # Display available voices
-        print("\n🎵 AVAILABLE VOICES:")
-        print(self._format_voices_display())
+        intro.append("\n🎵 AVAILABLE VOICES:")
+        intro.append(self._voices_display)
         
-        print("\nGenerate personalized stories with voice narration!\n")
+        intro.append("\nGenerate personalized stories with voice narration!\n")
+        print("\n".join(intro))
         
         while True:
             try:
-                print("\n" + "="*60)
-                moral = input("Enter a moral/value to teach (or 'quit' to exit): ").strip()
+                print(PROMPT_RULE)
+                moral = (await ainput("Enter a moral/value to teach (or 'quit' to exit): ")).strip()
                 
                 if moral.lower() in ['quit', 'exit', 'q']:
                     print("👋 Thanks for using the Voice Storyteller! Goodbye!")
@@ -431,20 +590,16 @@ class EnhancedVoiceStorytellerClient:
                     continue
                 
                 # Enhanced length selection
-                print("\n📊 Story Length Options:")
-                print("   1. Short (50 words) - Quick lesson")
-                print("   2. Medium (75 words) - Balanced story [Recommended]") 
-                print("   3. Long (100 words) - Detailed narrative")
-                print("   4. Custom length")
+                print(LENGTH_MENU)
                 
-                length_choice = input("Choose length (1-4, or Enter for Medium): ").strip()
+                length_choice = (await ainput("Choose length (1-4, or Enter for Medium): ")).strip()
                 
                 length_map = {"1": 50, "2": 75, "3": 100}
                 if length_choice in length_map:
                     length = length_map[length_choice]
                 elif length_choice == "4":
                     try:
-                        length = int(input("Enter custom word count (20-200): ").strip())
+                        length = int((await ainput("Enter custom word count (20-200): ")).strip())
                         length = max(20, min(length, 200))
                     except ValueError:
                         length = 75
@@ -453,27 +608,17 @@ class EnhancedVoiceStorytellerClient:
                     length = 75
                 
                 # Voice selection
-                use_voice = input("Add voice narration? (Y/n): ").strip().lower()
+                use_voice = (await ainput("Add voice narration? (Y/n): ")).strip().lower()
                 narrate = use_voice != 'n'
                 voice_id = None
                 
                 if narrate and self.available_voices:
-                    print("\n🎙️ Choose a voice:")
-                    print("   0. Default narrator")
+                    print(self._voice_menu)
                     
-                    # Create a flat list of available voices
-                    voice_options = []
-                    for engine_voices in self.available_voices.values():
-                        voice_options.extend([v for v in engine_voices if v['available']])
-                    
-                    for i, voice in enumerate(voice_options, 1):
-                        engine_emoji = {"pyttsx3": "🖥️", "gtts": "🌍", "edge_tts": "🎭"}.get(
-                            voice.get('engine', ''), "🎵"
-                        )
-                        print(f"   {i}. {engine_emoji} {voice['name']}")
+                    voice_options = self._voice_options
                     
                     try:
-                        choice = input(f"Select voice (0-{len(voice_options)}, or Enter for default): ").strip()
+                        choice = (await ainput(f"Select voice (0-{len(voice_options)}, or Enter for default): ")).strip()
                         if choice and choice != "0":
                             choice_idx = int(choice) - 1
                             if 0 <= choice_idx < len(voice_options):
@@ -488,22 +633,29 @@ class EnhancedVoiceStorytellerClient:
                         voice_id = "default_narrator"
                         print("Using default narrator")
                 
-                show_details = input("Show generation details? (y/N): ").strip().lower() == 'y'
+                stream = (await ainput("Stream the story as it is written? (y/N): ")).strip().lower() == 'y'
+                show_details = False
+                if not stream:
+                    show_details = (await ainput("Show generation details? (y/N): ")).strip().lower() == 'y'
                 
                 print(f"\n🎨 Generating {length}-word story about '{moral}'...")
-                if narrate:
-                    print("🎙️ Preparing voice narration...")
-                print("⏳ Please wait...")
-                
-                story_output = await self.request_story(moral, length, voice_id, narrate, show_details)
-                print("\n" + story_output)
+                if stream:
+                    self.last_audio_file = None
+                    await self.stream_story(moral, length, voice_id if narrate else None)
+                else:
+                    if narrate:
+                        print("🎙️ Preparing voice narration...")
+                    print("⏳ Please wait...")
+                    
+                    story_output = await self.request_story(moral, length, voice_id, narrate, show_details)
+                    print("\n" + story_output)
                 
                 # Voice controls
                 while True:
                     if self.last_audio_file:
-                        action = input("\n🎵 Voice controls: 'play', 'replay' | Story options: 'new', 'continue' | Quit: 'q': ").strip().lower()
+                        action = (await ainput("\n🎵 Voice controls: 'play', 'replay' | Story options: 'new', 'continue' | Quit: 'q': ")).strip().lower()
                     else:
-                        action = input("\n📖 Options: 'new' story, 'continue', or 'q' to quit: ").strip().lower()
+                        action = (await ainput("\n📖 Options: 'new' story, 'continue', or 'q' to quit: ")).strip().lower()
                     
                     if action in ['q', 'quit', 'continue', '']:
                         break
@@ -513,14 +665,14 @@ class EnhancedVoiceStorytellerClient:
                         print("🎵 Playing story narration...")
                         if system == "Darwin":
                             print("🍎 Using afplay - no Music app will open!")
-                        success = self.audio_player.play_audio_file(self.last_audio_file)
+                        success = await self._play_last_narration()
                         if success:
                             print("✅ Audio playback completed")
                         else:
                             print("❌ Could not play audio file")
                     elif action == 'voices':
                         print("\n🎙️ Available Voices:")
-                        print(self._format_voices_display())
+                        print(self._voices_display)
                     else:
                         print("❓ Unknown command. Try: play, new, continue, or q")
                 
@@ -538,7 +690,7 @@ class EnhancedVoiceStorytellerClient:
     
     async def demo_mode(self):
         """Run voice demonstration mode."""
-        system = platform.system()
+        system = SYSTEM
         print("🎬 Starting Voice Narration Demo Mode")
         if system == "Darwin":
             print("🍎 macOS Demo - No Music App Interference!\n")
@@ -560,24 +712,34 @@ class EnhancedVoiceStorytellerClient:
             }
         ]
         
-        for i, request in enumerate(demo_requests, 1):
-            print(f"🎭 Demo {i}/{len(demo_requests)}: {request['note']}")
-            
-            story_output = await self.request_story(
+        def _start_demo(request: Dict[str, Any]) -> "asyncio.Task[str]":
+            self.last_audio_file = None
+            return asyncio.create_task(self.request_story(
                 request["moral"], 
                 request["length"],
                 request["voice_id"],
                 narrate=True,
                 show_details=True
-            )
+            ))
+        
+        next_story = _start_demo(demo_requests[0])
+        for i, request in enumerate(demo_requests, 1):
+            print(f"🎭 Demo {i}/{len(demo_requests)}: {request['note']}")
+            
+            story_output = await next_story
             print(story_output)
+            audio_files = list(self.last_audio_files) if self.last_audio_file else []
+            
+            # Generate the next demo while this one plays
+            if i < len(demo_requests):
+                next_story = _start_demo(demo_requests[i])
             
             # Auto-play demo audio
-            if self.last_audio_file:
+            if audio_files:
                 print("🎵 Auto-playing demo narration...")
                 if system == "Darwin":
                     print("🍎 Using afplay (macOS native)")
-                success = self.audio_player.play_audio_file(self.last_audio_file)
+                success = await self._play_last_narration(audio_files)
                 if success:
                     print("✅ Demo audio completed")
             
@@ -588,7 +750,7 @@ class EnhancedVoiceStorytellerClient:
 async def main():
     """Main function for the enhanced voice client - macOS compatible."""
     client = EnhancedVoiceStorytellerClient()
-    system = platform.system()
+    system = SYSTEM
     
     try:
         # Display startup info
@@ -599,46 +761,24 @@ async def main():
         
         # Check dependencies
         print("\n🔍 Checking voice dependencies...")
-        try:
-            import pyttsx3
-            print("  ✅ pyttsx3 (offline TTS)")
-        except ImportError:
-            print("  ❌ pyttsx3 - install with: pip install pyttsx3")
-        
-        try:
-            import gtts
-            print("  ✅ gTTS (Google TTS)")
-        except ImportError:
-            print("  ❌ gTTS - install with: pip install gtts")
-        
-        try:
-            import edge_tts
-            print("  ✅ Edge TTS (Microsoft voices)")
-        except ImportError:
-            print("  ❌ Edge TTS - install with: pip install edge-tts")
+        # The server module already probed installed engines and players when it was imported
+        print("  ✅ pyttsx3 (offline TTS)" if voice_engines["pyttsx3"]
+              else "  ❌ pyttsx3 - install with: pip install pyttsx3")
+        print("  ✅ gTTS (Google TTS)" if voice_engines["gtts"]
+              else "  ❌ gTTS - install with: pip install gtts")
+        print("  ✅ Edge TTS (Microsoft voices)" if voice_engines["edge_tts"]
+              else "  ❌ Edge TTS - install with: pip install edge-tts")
         
         # Check audio support
         print("\n🔊 Checking audio playback...")
-        audio_player = AudioPlayer()
         if system == "Darwin":
-            try:
-                result = subprocess.run(["which", "afplay"], check=True, 
-                                       capture_output=True, text=True)
+            if shutil.which("afplay"):
                 print("  ✅ afplay available (macOS native - no Music app!)")
-            except (subprocess.CalledProcessError, FileNotFoundError):
+            else:
                 print("  ❌ afplay not found (should be available on macOS)")
         elif system == "Linux":
-            players = ["paplay", "aplay", "play", "mpg123"]
-            found_players = []
-            for player in players:
-                try:
-                    subprocess.run(["which", player], check=True,
-                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                    found_players.append(player)
-                except:
-                    pass
-            if found_players:
-                print(f"  ✅ Audio players: {', '.join(found_players)}")
+            if INSTALLED_LINUX_PLAYERS:
+                print(f"  ✅ Audio players: {', '.join(INSTALLED_LINUX_PLAYERS)}")
             else:
                 print("  ⚠️ Limited audio support")
         elif system == "Windows":
@@ -657,7 +797,7 @@ async def main():
         await client.start()
         
         # Choice of demo or interactive
-        mode = input("Choose mode: (d)emo or (i)nteractive? (default: interactive): ").strip().lower()
+        mode = (await ainput("Choose mode: (d)emo or (i)nteractive? (default: interactive): ")).strip().lower()
         
         if mode.startswith('d'):
             await client.demo_mode()
@@ -684,4 +824,9 @@ async def main():
         await client.stop()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    install_event_loop()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        # Ctrl-C at a prompt cancels main() rather than raising inside it
+        print("\n👋 Session ended by user.")
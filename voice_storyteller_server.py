@@ -5,51 +5,121 @@ Fixed for macOS compatibility - no more Music app launching!
 """
 
 import asyncio
+import base64
+import io
 import json
 import random
+import re
 import os
 import tempfile
 import threading
+import itertools
 import subprocess
 import platform
-from typing import Dict, List, Any, Optional
+import shutil
+import hashlib
+import sys
+import time
+import importlib.metadata
+import importlib.util
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 import logging
 from pathlib import Path
 
-# Voice synthesis imports
-voice_engines = {}
-try:
-    import pyttsx3
-    voice_engines['pyttsx3'] = True
-except ImportError:
-    voice_engines['pyttsx3'] = False
+# Host OS, looked up once for the platform-specific branches below
+SYSTEM = platform.system()
 
-try:
-    from gtts import gTTS
+# Voice synthesis engines are imported where they are used; only probe that they are installed
+voice_engines = {
+    'pyttsx3': importlib.util.find_spec('pyttsx3') is not None,
     # Remove pygame dependency for macOS compatibility
-    voice_engines['gtts'] = True
-except ImportError:
-    voice_engines['gtts'] = False
+    'gtts': importlib.util.find_spec('gtts') is not None,
+    'edge_tts': importlib.util.find_spec('edge_tts') is not None
+}
 
-try:
-    import edge_tts
-    voice_engines['edge_tts'] = True
-except ImportError:
-    voice_engines['edge_tts'] = False
+# Async HTTP for talking to the Google TTS endpoint without a worker thread
+AIOHTTP_AVAILABLE = importlib.util.find_spec('aiohttp') is not None
 
-# Claude integration imports
+# Optional async file writes for generated audio
+AIOFILES_AVAILABLE = importlib.util.find_spec('aiofiles') is not None
+# On Linux, aiofile writes through the kernel's native async I/O (io_uring or libaio) instead of a thread
+AIOFILE_AVAILABLE = SYSTEM == "Linux" and importlib.util.find_spec('aiofile') is not None
+
+# Faster JSON encoding and decoding for tool responses when orjson is installed
 try:
-    import anthropic
-    CLAUDE_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    CLAUDE_AVAILABLE = False
+    ORJSON_AVAILABLE = False
+
+# libuv-based event loop for the server and client entry points; not available on Windows
+UVLOOP_AVAILABLE = SYSTEM != "Windows" and importlib.util.find_spec('uvloop') is not None
+
+# Claude integration; anthropic is imported only once an API key is configured
+CLAUDE_AVAILABLE = importlib.util.find_spec('anthropic') is not None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Tool responses are compact on the wire; set HIKAYA_PRETTY_JSON=1 to indent them for debugging
+PRETTY_JSON = os.getenv("HIKAYA_PRETTY_JSON") == "1"
+
+def dumps_json(obj: Any) -> str:
+    """Serialize a tool response payload to a JSON string."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if PRETTY_JSON else 0).decode()
+    if PRETTY_JSON:
+        return json.dumps(obj, indent=2)
+    return json.dumps(obj, separators=(",", ":"))
+
+def loads_json(text: str) -> Any:
+    """Parse a tool response payload from a JSON string."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(text)
+    return json.loads(text)
+
+def install_event_loop():
+    """Switch asyncio to uvloop when it is installed."""
+    if UVLOOP_AVAILABLE:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+# Google Translate TTS endpoint and the base64 audio payload in its batchexecute response
+GTTS_URL = "https://translate.google.{tld}/_/TranslateWebserverUi/data/batchexecute"
+GTTS_AUDIO_PATTERN = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+# Seconds a Google TTS request may take; gTTS itself defaults to waiting forever
+GTTS_TIMEOUT = 30
+
+# Sentence boundaries used to split streamed text into narration chunks
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+# Static Claude prompt blocks - kept byte-identical across calls so the prefix can be prompt-cached
+STORY_SYSTEM_PROMPT = "You are a creative children's storyteller who writes engaging, age-appropriate stories that teach important moral lessons. Your stories are designed for children ages 5-10 and are perfect for voice narration."
+
+STORY_INSTRUCTIONS = """Write a children's story that teaches the moral value given below.
+
+Requirements:
+- Target length: approximately the number of words given below
+- Age appropriate for children 5-10 years old
+- Story style: as given below
+- IMPORTANT: Optimize for voice narration with clear pauses, engaging rhythm, and expressive dialogue
+- Use natural speech patterns and conversational tone
+- Include character voices that are distinct and fun to narrate
+- Add emotional cues and descriptive words that enhance audio storytelling
+- Structure sentences for easy speaking and listening comprehension
+- The moral lesson should be woven naturally into the story
+- Create memorable character names that are easy to pronounce
+- Please do not add any unnecessary notes about the story meaning at the end, just use the target length to write the story only.
+Focus on creating a story that sounds engaging when read aloud and teaches the moral through compelling characters and situations."""
+
+# Slotted dataclasses drop the per-instance __dict__; slots= needs Python 3.10+
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class VoiceProfile:
     """Represents a voice profile with characteristics."""
     id: str
@@ -62,18 +132,300 @@ class VoiceProfile:
     speed: float = 1.0
     pitch: float = 1.0
 
+# Map voice profiles to Edge TTS voices
+EDGE_TTS_VOICES = {
+    "edge_jenny": "en-US-JennyNeural",
+    "edge_guy": "en-US-GuyNeural",
+    "edge_aria": "en-US-AriaNeural",
+    "edge_davis": "en-US-DavisNeural"
+}
+
+# Player that can read audio from stdin, used to start playback before synthesis finishes
+STREAMING_PLAYER = shutil.which("ffplay")
+
+# Edge TTS sessions open at once; the service throttles clients that open many more
+EDGE_TTS_CONCURRENCY = 3
+# Texts longer than this are synthesized sentence by sentence in parallel
+EDGE_TTS_SPLIT_WORDS = 80
+# Google TTS requests in flight at once; bursts beyond this get answered with HTTP 429
+GTTS_CONCURRENCY = 4
+
+# Claude stories are kept between runs here unless HIKAYA_STORY_CACHE points elsewhere
+STORY_CACHE_FILE = os.getenv("HIKAYA_STORY_CACHE") or os.path.join(os.path.expanduser("~"), ".cache", "hikaya-stories.json")
+
+# Caps on client-supplied work per tool call
+MIN_STORY_WORDS = 10
+MAX_STORY_WORDS = 400
+MAX_NARRATE_CHARS = 4000
+MAX_PREGENERATE_MORALS = 50
+
+# Seconds a finished background narration waits to be polled before it is dropped
+NARRATION_RESULT_TTL = 600
+
+def _synth_concurrency() -> int:
+    """Read HIKAYA_SYNTH_CONCURRENCY, falling back to a default sized to the CPU count."""
+    # Synthesis is CPU bound for pyttsx3 and decoding, so a quarter of the cores avoids oversubscribing;
+    # the online engines are further capped by their own session limits above
+    default = max(1, (os.cpu_count() or 1) // 4)
+    value = os.getenv("HIKAYA_SYNTH_CONCURRENCY")
+    if value is None:
+        return default
+    try:
+        return max(1, int(value))
+    except ValueError:
+        logger.warning(f"⚠️ Ignoring invalid HIKAYA_SYNTH_CONCURRENCY={value!r}, using {default}")
+        return default
+
+# Upper bound on narrations synthesizing concurrently; raise it on machines with spare cores
+SYNTH_CONCURRENCY = _synth_concurrency()
+
+# Narrations are cached across runs here unless HIKAYA_CACHE_DIR points elsewhere;
+# one process owns the directory at a time, so give concurrent servers a directory each
+AUDIO_CACHE_DIR = os.getenv("HIKAYA_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "hikaya-tts")
+# Bump to retire every cached narration after changing how audio is produced
+AUDIO_CACHE_VERSION = 1
+# Disk budget for cached narrations; least recently used files are evicted beyond it
+AUDIO_CACHE_MAX_BYTES = int(float(os.getenv("HIKAYA_CACHE_MAX_MB", "512")) * 1024 * 1024)
+
+# Linux command-line players in order of preference, and those actually on PATH
+LINUX_PLAYERS = ("paplay", "aplay", "play", "mpg123", "ffplay")
+INSTALLED_LINUX_PLAYERS = tuple(p for p in LINUX_PLAYERS if shutil.which(p)) if SYSTEM == "Linux" else ()
+
+# With PyObjC on macOS, narrations play through a preloaded AVAudioPlayer instead of spawning afplay
+AVFOUNDATION_AVAILABLE = SYSTEM == "Darwin" and importlib.util.find_spec('AVFoundation') is not None
+
+# With sounddevice, narrations are decoded in process and written to one long-lived output stream
+SOUNDDEVICE_AVAILABLE = all(importlib.util.find_spec(name) is not None
+                            for name in ('sounddevice', 'numpy', 'pydub'))
+# Locking that keeps a second process out of an audio cache directory in use
+FCNTL_AVAILABLE = importlib.util.find_spec('fcntl') is not None
+MSVCRT_AVAILABLE = importlib.util.find_spec('msvcrt') is not None
+
+# gTTS and Edge TTS both produce 24 kHz mono audio
+PLAYBACK_SAMPLE_RATE = 24000
+
 class AudioPlayer:
     """Cross-platform audio player that avoids Music app on macOS."""
     
+    # Linux player that last played each file extension, tried first next time
+    _linux_player_by_extension: Dict[str, str] = {}
+    
+    # AVAudioPlayers already decoded and primed, most recently used last; loads run on the playback threads
+    _prepared: "OrderedDict[str, Any]" = OrderedDict()
+    _prepared_max = 8
+    _prepared_lock = threading.Lock()
+    # Loads under way, by file, so playback and lookahead share one decode
+    _preparing: Dict[str, "asyncio.Future"] = {}
+    # Files of a multi-part narration preloaded ahead of the one playing
+    PREPARE_AHEAD = 2
+    
+    # Blocking playback runs here, apart from the default executor that synthesis work shares
+    _playback_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="playback")
+    
+    # Result of the one-time playback support probe
+    _audio_support: Optional[Dict[str, bool]] = None
+    
+    # Shared sounddevice output stream, opened on first use; the lock serializes writers
+    _out_stream = None
+    _out_stream_lock = threading.Lock()
+    # Set once in-process playback fails, so later files go straight to the system players
+    _sounddevice_disabled = False
+    
+    @staticmethod
+    def _sounddevice_usable() -> bool:
+        """Whether in-process playback is installed and has not failed yet."""
+        return SOUNDDEVICE_AVAILABLE and not AudioPlayer._sounddevice_disabled
+    
+    @staticmethod
+    def _disable_sounddevice(error: Exception):
+        """Stop trying in-process playback after a failure that would only repeat."""
+        if not AudioPlayer._sounddevice_disabled:
+            AudioPlayer._sounddevice_disabled = True
+            logger.warning(f"⚠️ In-process playback failed, using system players from now on: {error}")
+    
+    @classmethod
+    def _linux_players_for(cls, audio_file: str) -> List[str]:
+        """Order installed Linux players with the last one that worked for this format first."""
+        preferred = cls._linux_player_by_extension.get(os.path.splitext(audio_file)[1].lower())
+        if preferred is None:
+            return list(INSTALLED_LINUX_PLAYERS)
+        return [preferred] + [p for p in INSTALLED_LINUX_PLAYERS if p != preferred]
+    
+    @classmethod
+    def _remember_linux_player(cls, audio_file: str, player: str):
+        """Record the player that handled this file's format."""
+        cls._linux_player_by_extension[os.path.splitext(audio_file)[1].lower()] = player
+    
+    @staticmethod
+    def _run_blocking(func: Callable, *args: Any) -> "asyncio.Future":
+        """Run a blocking playback call on the playback threads."""
+        return asyncio.get_running_loop().run_in_executor(AudioPlayer._playback_executor, func, *args)
+    
+    @staticmethod
+    def prepare(audio_file: str) -> bool:
+        """Load and prime a macOS player for this file so playing it later starts at once."""
+        if not AVFOUNDATION_AVAILABLE or not audio_file or not os.path.isfile(audio_file):
+            return False
+        with AudioPlayer._prepared_lock:
+            if audio_file in AudioPlayer._prepared:
+                AudioPlayer._prepared.move_to_end(audio_file)
+                return True
+        
+        try:
+            from AVFoundation import AVAudioPlayer
+            from Foundation import NSURL
+            
+            player, error = AVAudioPlayer.alloc().initWithContentsOfURL_error_(
+                NSURL.fileURLWithPath_(audio_file), None
+            )
+            if player is None or not player.prepareToPlay():
+                logger.warning(f"⚠️ Could not preload audio: {error}")
+                return False
+        except Exception as e:
+            logger.warning(f"⚠️ Could not preload audio: {e}")
+            return False
+        
+        with AudioPlayer._prepared_lock:
+            AudioPlayer._prepared[audio_file] = player
+            while len(AudioPlayer._prepared) > AudioPlayer._prepared_max:
+                AudioPlayer._prepared.popitem(last=False)
+        return True
+    
+    @staticmethod
+    def prepare_soon(audio_file: str) -> Optional["asyncio.Future"]:
+        """Start preloading a file on the playback threads, or join the load already under way."""
+        # sounddevice plays ahead of AVAudioPlayer, which would never use the preload
+        if not AVFOUNDATION_AVAILABLE or AudioPlayer._sounddevice_usable() or not audio_file:
+            return None
+        with AudioPlayer._prepared_lock:
+            loaded = audio_file in AudioPlayer._prepared
+            if loaded:
+                AudioPlayer._prepared.move_to_end(audio_file)
+        if loaded:
+            done = asyncio.get_running_loop().create_future()
+            done.set_result(True)
+            return done
+        pending = AudioPlayer._preparing.get(audio_file)
+        if pending is None:
+            pending = AudioPlayer._run_blocking(AudioPlayer.prepare, audio_file)
+            AudioPlayer._preparing[audio_file] = pending
+            pending.add_done_callback(lambda _: AudioPlayer._preparing.pop(audio_file, None))
+        return pending
+    
+    @staticmethod
+    async def prepare_async(audio_file: str) -> bool:
+        """Preload a file for playback without decoding it on the event loop."""
+        pending = AudioPlayer.prepare_soon(audio_file)
+        if pending is None:
+            return False
+        # Shielded, so a cancelled player does not abort a load other callers wait on
+        return await asyncio.shield(pending)
+    
+    @staticmethod
+    async def play_audio_files_async(audio_files: List[str]) -> bool:
+        """Play files in order, preloading the next few while each one plays."""
+        for index, audio_file in enumerate(audio_files):
+            for upcoming in audio_files[index + 1:index + 1 + AudioPlayer.PREPARE_AHEAD]:
+                AudioPlayer.prepare_soon(upcoming)
+            if not await AudioPlayer.play_audio_file_async(audio_file):
+                return False
+        return True
+    
+    @staticmethod
+    async def _play_prepared(audio_file: str) -> bool:
+        """Play a file through its preloaded macOS player, returning False if it has none."""
+        if not await AudioPlayer.prepare_async(audio_file):
+            return False
+        
+        with AudioPlayer._prepared_lock:
+            player = AudioPlayer._prepared.get(audio_file)
+        if player is None:
+            return False
+        player.setCurrentTime_(0)
+        if not player.play():
+            return False
+        # AVAudioPlayer plays on its own audio thread; just wait out the clip
+        await asyncio.sleep(player.duration())
+        while player.isPlaying():
+            await asyncio.sleep(0.05)
+        return True
+    
+    @staticmethod
+    def _play_with_sounddevice(source: Any, audio_format: Optional[str] = None) -> bool:
+        """Decode a file or buffer and write it to the shared output stream, blocking until it has played."""
+        try:
+            import numpy as np
+            import sounddevice as sd
+            from pydub import AudioSegment
+            
+            segment = (AudioSegment.from_file(source, format=audio_format)
+                       .set_frame_rate(PLAYBACK_SAMPLE_RATE).set_channels(1).set_sample_width(2))
+            audio = (np.frombuffer(segment.raw_data, dtype=np.int16).astype(np.float32) / 32768).reshape(-1, 1)
+            
+            with AudioPlayer._out_stream_lock:
+                stream = AudioPlayer._open_output_stream(sd)
+                # write() blocks in PortAudio until each block is queued
+                for start in range(0, len(audio), 4096):
+                    stream.write(audio[start:start + 4096])
+            return True
+        except Exception as e:
+            AudioPlayer._disable_sounddevice(e)
+            return False
+    
+    @staticmethod
+    def _open_output_stream(sd: Any) -> Any:
+        """Return the shared output stream, starting it on first use; call with the stream lock held."""
+        if AudioPlayer._out_stream is None:
+            stream = sd.OutputStream(samplerate=PLAYBACK_SAMPLE_RATE, channels=1, dtype="float32",
+                                     blocksize=2048, latency="high")
+            stream.start()
+            AudioPlayer._out_stream = stream
+        return AudioPlayer._out_stream
+    
+    @staticmethod
+    def warm_up() -> bool:
+        """Load the in-process playback libraries and open the output stream ahead of the first narration."""
+        if not AudioPlayer._sounddevice_usable():
+            return False
+        try:
+            import numpy  # noqa: F401
+            import sounddevice as sd
+            from pydub import AudioSegment  # noqa: F401
+            with AudioPlayer._out_stream_lock:
+                AudioPlayer._open_output_stream(sd)
+        except Exception as e:
+            AudioPlayer._disable_sounddevice(e)
+            return False
+        return True
+    
+    @staticmethod
+    async def play_audio_data(audio: bytes, audio_file: str) -> bool:
+        """Play audio already in memory, falling back to its saved copy at audio_file."""
+        audio_format = os.path.splitext(audio_file)[1].lstrip(".") or None
+        if AudioPlayer._sounddevice_usable() and await AudioPlayer._run_blocking(
+                AudioPlayer._play_with_sounddevice, io.BytesIO(audio), audio_format):
+            logger.info("✅ Playing with sounddevice")
+            return True
+        return await AudioPlayer.play_audio_file_async(audio_file)
+    
+    @staticmethod
+    def close_output_stream():
+        """Stop and release the shared output stream, if one was opened."""
+        with AudioPlayer._out_stream_lock:
+            if AudioPlayer._out_stream is not None:
+                AudioPlayer._out_stream.stop()
+                AudioPlayer._out_stream.close()
+                AudioPlayer._out_stream = None
+    
     @staticmethod
     def play_audio_file(audio_file: str) -> bool:
         """Play audio file using system-appropriate method."""
-        if not audio_file or not os.path.exists(audio_file):
+        if not audio_file or not os.path.isfile(audio_file):
             logger.error("Audio file not found")
             return False
         
         try:
-            system = platform.system()
+            system = SYSTEM
             
             if system == "Darwin":  # macOS
                 # Use afplay instead of open to avoid Music app
@@ -82,13 +434,13 @@ class AudioPlayer:
                 return True
                 
             elif system == "Linux":
-                # Try multiple players in order of preference
-                players = ["paplay", "aplay", "play", "mpg123", "ffplay"]
-                for player in players:
+                # Only try players found on PATH; one may still reject the file format
+                for player in AudioPlayer._linux_players_for(audio_file):
                     try:
                         subprocess.run([player, audio_file], check=True, 
                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                        logger.info(f"✅ Playing with {player}")
+                        AudioPlayer._remember_linux_player(audio_file, player)
+                        logger.info("✅ Playing with %s", player)
                         return True
                     except (subprocess.CalledProcessError, FileNotFoundError):
                         continue
@@ -98,8 +450,18 @@ class AudioPlayer:
                 return True
                 
             elif system == "Windows":
-                # Use Windows Media Player command line
-                subprocess.run(["start", "/wait", "", audio_file], shell=True)
+                if audio_file.lower().endswith(".wav"):
+                    # Play WAV through WinMM directly instead of spawning a shell
+                    import ctypes
+                    SND_FILENAME = 0x00020000
+                    ctypes.windll.winmm.PlaySoundW(audio_file, None, SND_FILENAME)
+                    return True
+                try:
+                    subprocess.run(["ffplay", "-nodisp", "-autoexit", audio_file], check=True,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                except FileNotFoundError:
+                    # No ffplay on PATH; hand off to the default player
+                    os.startfile(audio_file)
                 return True
                 
             else:
@@ -113,64 +475,425 @@ class AudioPlayer:
             logger.error(f"❌ Unexpected audio error: {e}")
             return False
     
+    @staticmethod
+    async def play_audio_file_async(audio_file: str) -> bool:
+        """Play audio file without blocking the event loop while it plays."""
+        if not audio_file or not os.path.isfile(audio_file):
+            logger.error("Audio file not found")
+            return False
+        
+        async def _run(*command: str) -> int:
+            process = await asyncio.create_subprocess_exec(
+                *command, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+            )
+            return await process.wait()
+        
+        try:
+            system = SYSTEM
+            
+            if AudioPlayer._sounddevice_usable() and await AudioPlayer._run_blocking(
+                    AudioPlayer._play_with_sounddevice, audio_file):
+                logger.info("✅ Playing with sounddevice")
+                return True
+            
+            if system == "Darwin":  # macOS
+                if await AudioPlayer._play_prepared(audio_file):
+                    logger.info("✅ Playing with AVAudioPlayer (macOS native)")
+                    return True
+                # Use afplay instead of open to avoid Music app
+                if await _run("afplay", audio_file) != 0:
+                    logger.error("❌ Audio playback failed: afplay exited with an error")
+                    return False
+                logger.info("✅ Playing with afplay (macOS native)")
+                return True
+                
+            elif system == "Linux":
+                # Only try players found on PATH; one may still reject the file format
+                for player in AudioPlayer._linux_players_for(audio_file):
+                    if await _run(player, audio_file) == 0:
+                        AudioPlayer._remember_linux_player(audio_file, player)
+                        logger.info("✅ Playing with %s", player)
+                        return True
+                
+                # Fallback to xdg-open
+                await _run("xdg-open", audio_file)
+                return True
+                
+            elif system == "Windows":
+                if audio_file.lower().endswith(".wav") or not shutil.which("ffplay"):
+                    # WinMM and the default player only have blocking APIs
+                    return await AudioPlayer._run_blocking(AudioPlayer.play_audio_file, audio_file)
+                return await _run("ffplay", "-nodisp", "-autoexit", audio_file) == 0
+                
+            else:
+                logger.warning(f"Unknown system: {system}")
+                return False
+                
+        except Exception as e:
+            logger.error(f"❌ Unexpected audio error: {e}")
+            return False
+    
     @staticmethod
     def is_audio_supported() -> Dict[str, bool]:
         """Check which audio playback methods are available."""
-        system = platform.system()
+        # Installed players do not change while the process runs
+        if AudioPlayer._audio_support is None:
+            AudioPlayer._audio_support = AudioPlayer._probe_audio_support()
+        return dict(AudioPlayer._audio_support)
+    
+    @staticmethod
+    def _probe_audio_support() -> Dict[str, bool]:
+        """Look up the playback methods this system offers."""
+        system = SYSTEM
         supported = {}
         
         if system == "Darwin":  # macOS
-            try:
-                subprocess.run(["which", "afplay"], check=True, 
-                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                supported["afplay"] = True
-            except:
-                supported["afplay"] = False
+            supported["afplay"] = shutil.which("afplay") is not None
                 
         elif system == "Linux":
-            players = ["paplay", "aplay", "play", "mpg123", "ffplay"]
-            for player in players:
-                try:
-                    subprocess.run(["which", player], check=True,
-                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                    supported[player] = True
-                except:
-                    supported[player] = False
+            # Players on PATH were already looked up at import
+            for player in LINUX_PLAYERS:
+                supported[player] = player in INSTALLED_LINUX_PLAYERS
                     
         elif system == "Windows":
             supported["windows_media"] = True  # Usually available
             
         return supported
 
+class AudioCache:
+    """LRU cache of synthesized narrations keyed by text and voice settings."""
+    
+    AUDIO_EXTENSIONS = {"pyttsx3": "wav", "gtts": "mp3", "edge_tts": "mp3"}
+    ENGINE_DISTRIBUTIONS = {"pyttsx3": "pyttsx3", "gtts": "gTTS", "edge_tts": "edge-tts"}
+    # Bookkeeping kept alongside each entry but never handed back to callers
+    BOOKKEEPING_FIELDS = frozenset({"size_bytes", "created_at"})
+    _engine_versions: Dict[str, str] = {}
+    
+    def __init__(self, cache_dir: str, max_size: int = 256, max_bytes: int = AUDIO_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._total_bytes = 0
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    @staticmethod
+    def make_key(text: str, profile: VoiceProfile) -> str:
+        """Build a cache key from the text and the voice settings that shape the audio."""
+        # Salting with the cache format and engine versions retires audio from older voice models
+        raw = (f"{AUDIO_CACHE_VERSION}|{AudioCache._engine_version(profile.engine)}|"
+               f"{profile.id}|{profile.engine}|{profile.language}|{profile.speed}|{profile.pitch}|{text}").encode()
+        return hashlib.blake2b(raw, digest_size=16).hexdigest()
+    
+    @staticmethod
+    def _engine_version(engine: str) -> str:
+        """Installed version of an engine's package, looked up once."""
+        version = AudioCache._engine_versions.get(engine)
+        if version is None:
+            try:
+                version = importlib.metadata.version(AudioCache.ENGINE_DISTRIBUTIONS.get(engine, engine))
+            except importlib.metadata.PackageNotFoundError:
+                version = ""
+            AudioCache._engine_versions[engine] = version
+        return version
+    
+    def path_for(self, key: str, engine: str) -> str:
+        """Get the on-disk location for a cached narration."""
+        return os.path.join(self.cache_dir, f"{key}.{self.AUDIO_EXTENSIONS.get(engine, 'mp3')}")
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached narration result, or None if missing or its file is gone."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if not os.path.isfile(entry["audio_file"]):
+            self._forget(key)
+            return None
+        self._entries.move_to_end(key)
+        result = {field: value for field, value in entry.items() if field not in self.BOOKKEEPING_FIELDS}
+        result["cache_hit"] = True
+        return result
+    
+    def put(self, key: str, result: Dict[str, Any]):
+        """Store a successful narration result, evicting the least recently used."""
+        if key in self._entries:
+            self._forget(key)
+        entry = dict(result)
+        try:
+            entry["size_bytes"] = os.path.getsize(entry["audio_file"])
+        except OSError:
+            entry["size_bytes"] = 0
+        self._add(key, entry)
+        self._evict_over_budget()
+    
+    def _evict_over_budget(self) -> int:
+        """Drop least recently used entries and their files until the cache fits its budget."""
+        evicted_count = 0
+        # Always keep the newest entry, even if it alone is over budget
+        while len(self._entries) > 1 and (len(self._entries) > self.max_size
+                                          or self._total_bytes > self.max_bytes):
+            evicted = self._forget(next(iter(self._entries)))
+            evicted_count += 1
+            try:
+                os.remove(evicted["audio_file"])
+            except OSError:
+                pass
+        return evicted_count
+    
+    async def flush(self):
+        """Persist anything not yet written; this cache keeps nothing on disk."""
+    
+    def _add(self, key: str, entry: Dict[str, Any]):
+        """Track an entry as the most recently used."""
+        self._entries[key] = entry
+        self._total_bytes += entry.get("size_bytes", 0)
+    
+    def _forget(self, key: str) -> Dict[str, Any]:
+        """Stop tracking an entry, leaving its file alone."""
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry.get("size_bytes", 0)
+        return entry
+
+class PersistentAudioCache(AudioCache):
+    """Audio cache that survives restarts through a JSON manifest in a stable directory."""
+    
+    MANIFEST_NAME = "manifest.json"
+    LOCK_NAME = ".lock"
+    # Directory locks this process holds, by lock path; closing any handle would drop a POSIX lock
+    _held_locks: Dict[str, Any] = {}
+    # Seconds to gather puts into one manifest write
+    MANIFEST_FLUSH_DELAY = 1.0
+    
+    def __init__(self, cache_dir: str, max_size: int = 256, ttl: float = 86400,
+                 max_bytes: int = AUDIO_CACHE_MAX_BYTES, executor: Optional[ThreadPoolExecutor] = None):
+        super().__init__(cache_dir, max_size, max_bytes)
+        self.ttl = ttl
+        self.manifest_path = os.path.join(cache_dir, self.MANIFEST_NAME)
+        # Manifest writes run here, off the event loop
+        self._executor = executor
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flushing: Optional["asyncio.Future"] = None
+        self._write_lock = threading.Lock()
+        self._lock_directory()
+        self._load_manifest()
+        # A previous run may have left more than the current budget allows
+        if self._evict_over_budget():
+            self._flush_manifest()
+    
+    def _lock_directory(self):
+        """Claim the cache directory for this process, raising OSError if another process holds it."""
+        # Each process writes only its own entries to the manifest and evicts files by its own
+        # budget, so two processes sharing a directory would orphan and delete each other's audio
+        lock_path = os.path.realpath(os.path.join(self.cache_dir, self.LOCK_NAME))
+        if lock_path in PersistentAudioCache._held_locks:
+            return
+        lock_file = open(lock_path, "a+b")
+        try:
+            if FCNTL_AVAILABLE:
+                import fcntl
+                fcntl.lockf(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            elif MSVCRT_AVAILABLE:
+                import msvcrt
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError as e:
+            lock_file.close()
+            raise OSError(f"{self.cache_dir} is in use by another process; "
+                          f"set HIKAYA_CACHE_DIR to give this one its own") from e
+        PersistentAudioCache._held_locks[lock_path] = lock_file
+    
+    def _load_manifest(self):
+        """Load entries from the previous run, dropping any that expired or lost their file."""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(entries, dict):
+            logger.warning(f"⚠️ Ignoring malformed audio cache manifest at {self.manifest_path}")
+            return
+        
+        now = time.time()
+        malformed = 0
+        for key, entry in entries.items():
+            # Skip entries another version or a damaged file left in a shape this one cannot use
+            if (not isinstance(entry, dict) or not isinstance(entry.get("audio_file"), str)
+                    or not isinstance(entry.get("created_at", 0), (int, float))):
+                malformed += 1
+                continue
+            if now - entry.get("created_at", 0) > self.ttl:
+                self._discard(entry)
+            elif os.path.isfile(entry["audio_file"]):
+                if not isinstance(entry.get("size_bytes"), int):
+                    entry["size_bytes"] = os.path.getsize(entry["audio_file"])
+                self._add(key, entry)
+        if malformed:
+            logger.warning(f"⚠️ Skipped {malformed} malformed audio cache entries")
+        logger.info(f"💾 Loaded {len(self._entries)} cached narrations from {self.cache_dir}")
+    
+    def _flush_manifest(self):
+        """Write the manifest now, blocking until it is on disk."""
+        self._write_manifest(dict(self._entries))
+    
+    def _write_manifest(self, entries: Dict[str, Dict[str, Any]]):
+        """Write a manifest snapshot atomically so a crash never leaves it half written."""
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with self._write_lock:
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(entries, f)
+                os.replace(tmp_path, self.manifest_path)
+            except OSError as e:
+                logger.warning(f"⚠️ Could not write audio cache manifest: {e}")
+    
+    def _schedule_flush(self):
+        """Write the manifest shortly on the executor, folding a burst of puts into one write."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop to defer to; write right away
+            self._flush_manifest()
+            return
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.MANIFEST_FLUSH_DELAY, self._start_flush, loop)
+    
+    def _start_flush(self, loop: asyncio.AbstractEventLoop):
+        """Hand a snapshot of the entries to the executor; entry dicts are never changed in place."""
+        self._flush_handle = None
+        self._flushing = loop.run_in_executor(self._executor, self._write_manifest, dict(self._entries))
+    
+    async def flush(self):
+        """Write out a pending manifest update now, waiting for any write under way."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._start_flush(asyncio.get_running_loop())
+        if self._flushing is not None:
+            await self._flushing
+            self._flushing = None
+    
+    @staticmethod
+    def _discard(entry: Dict[str, Any]):
+        """Delete an entry's audio file if it is still there."""
+        try:
+            os.remove(entry["audio_file"])
+        except (OSError, KeyError, TypeError):
+            pass
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached narration result unless it has expired."""
+        entry = self._entries.get(key)
+        if entry is not None and time.time() - entry.get("created_at", 0) > self.ttl:
+            self._forget(key)
+            self._discard(entry)
+            return None
+        return super().get(key)
+    
+    def put(self, key: str, result: Dict[str, Any]):
+        """Store a narration result and persist the manifest soon after."""
+        super().put(key, {**result, "created_at": time.time()})
+        self._schedule_flush()
+
 class VoiceNarrationEngine:
     """Manages multiple voice synthesis engines - macOS compatible."""
     
-    def __init__(self):
+    def __init__(self, start_engines: bool = True):
         self.engines = {}
+        # pyttsx3 drivers are bound to the thread that created them, so one worker owns the engine
+        self._pyttsx3_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pyttsx3")
+        # Small pool for other blocking synthesis work, so load cannot flood the default executor
+        self._tts_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tts")
+        # System voice chosen for each profile gender, and the (rate, voice) last set on the engine
+        self._pyttsx3_voice_ids: Dict[str, str] = {}
+        self._pyttsx3_settings: Optional[Tuple[int, Optional[str]]] = None
         self.temp_dir = tempfile.mkdtemp()
+        self._scratch_dir = Path(self.temp_dir)
+        self._audio_seq = itertools.count()
+        # Narrations being synthesized for saving, by cache key
+        self._pending_narrations: Dict[str, "asyncio.Future"] = {}
+        # Cap narrations synthesizing at once across all engines and clients
+        self._synth_semaphore = asyncio.Semaphore(SYNTH_CONCURRENCY)
+        # Cap simultaneous Edge TTS websocket sessions when narrating many chunks
+        self._edge_tts_semaphore = asyncio.Semaphore(EDGE_TTS_CONCURRENCY)
+        # Same for Google TTS requests, counting each text part fetched
+        self._gtts_semaphore = asyncio.Semaphore(GTTS_CONCURRENCY)
+        # Pooled HTTP session for gTTS requests, created on first use inside the event loop
+        self._http_session = None
+        # Cleared if this gTTS release lacks the internals the aiohttp path relies on
+        self._gtts_rpc_supported = True
         self.audio_player = AudioPlayer()
-        self._init_engines()
-        self.voice_profiles = self._create_voice_profiles()
+        # Guards rebuilding the voice listing in refresh_voices
+        self._voices_lock = asyncio.Lock()
+        # create() does the blocking setup on worker threads instead
+        if start_engines:
+            self.audio_cache = self._create_audio_cache()
+            self._init_engines()
+            self._finish_init()
+    
+    @classmethod
+    async def create(cls) -> "VoiceNarrationEngine":
+        """Build the engine on the running loop, loading the cache and pyttsx3 driver off it."""
+        # asyncio primitives need the loop's thread on Python < 3.10, so only the blocking parts move
+        engine = cls(start_engines=False)
+        loop = asyncio.get_running_loop()
+        engine.audio_cache = await loop.run_in_executor(engine._tts_executor, engine._create_audio_cache)
+        if voice_engines['pyttsx3'] and not await engine._start_pyttsx3():
+            voice_engines['pyttsx3'] = False
+        engine._finish_init()
+        return engine
+    
+    def _finish_init(self):
+        """Build the voice listing and check audio support once the engines are up."""
+        # No need to initialize pygame - we'll use system audio players
+        if voice_engines['gtts']:
+            logger.info("✅ gTTS available - will use system audio player")
+        
+        # Build the voice listing once; refresh_voices rebuilds it if engines are installed later
+        self._build_voice_catalog()
         
         # Check audio support
-        audio_support = self.audio_player.is_audio_supported()
-        logger.info(f"🎵 Audio support: {audio_support}")
+        self.audio_support = self.audio_player.is_audio_supported()
+        logger.info(f"🎵 Audio support: {self.audio_support}")
         
+    def _create_audio_cache(self) -> AudioCache:
+        """Use the persistent cache directory, falling back to a per-run cache."""
+        try:
+            return PersistentAudioCache(AUDIO_CACHE_DIR, executor=self._tts_executor)
+        except OSError as e:
+            logger.warning(f"⚠️ Persistent audio cache unavailable ({e}), caching for this run only")
+            return AudioCache(os.path.join(self.temp_dir, "cache"))
+    
     def _init_engines(self):
         """Initialize available voice engines."""
         # Initialize pyttsx3 (offline, cross-platform)
         if voice_engines['pyttsx3']:
             try:
-                engine = pyttsx3.init()
-                self.engines['pyttsx3'] = engine
+                self._pyttsx3_executor.submit(self._init_pyttsx3).result()
                 logger.info("✅ pyttsx3 engine initialized")
             except Exception as e:
                 logger.warning(f"⚠️ Failed to initialize pyttsx3: {e}")
                 voice_engines['pyttsx3'] = False
-        
-        # No need to initialize pygame - we'll use system audio players
-        if voice_engines['gtts']:
-            logger.info("✅ gTTS available - will use system audio player")
+    
+    async def _start_pyttsx3(self) -> bool:
+        """Initialize pyttsx3 on its worker thread without blocking the loop."""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._pyttsx3_executor, self._init_pyttsx3)
+            logger.info("✅ pyttsx3 engine initialized")
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to initialize pyttsx3: {e}")
+            return False
+    
+    def _init_pyttsx3(self):
+        """Create the pyttsx3 engine on its dedicated worker thread."""
+        import pyttsx3
+        engine = pyttsx3.init()
+        self.engines['pyttsx3'] = engine
+        # Enumerate system voices once and pick per gender; the list does not change at runtime
+        voices = engine.getProperty('voices') or []
+        if voices:
+            self._pyttsx3_voice_ids = {"default": voices[0].id,
+                                       "female": voices[1].id if len(voices) > 1 else voices[0].id}
     
     def _create_voice_profiles(self) -> Dict[str, VoiceProfile]:
         """Create predefined voice profiles for different engines."""
@@ -213,8 +936,37 @@ class VoiceNarrationEngine:
         
         return profiles
     
+    def _build_voice_catalog(self):
+        """Create the voice profiles and their pre-serialized listing."""
+        self.voice_profiles = self._create_voice_profiles()
+        self._voices_response = self._build_voices_response()
+        self._voices_json = dumps_json(self._voices_response)
+        self._fallback_voice_id = next((v.id for v in self.voice_profiles.values()
+                                        if voice_engines.get(v.engine, False)), None)
+    
+    async def refresh_voices(self) -> str:
+        """Re-probe the voice engines and rebuild the cached voice listing."""
+        async with self._voices_lock:
+            importlib.invalidate_caches()
+            for engine in ('gtts', 'edge_tts'):
+                voice_engines[engine] = importlib.util.find_spec(engine) is not None
+            if 'pyttsx3' not in self.engines and importlib.util.find_spec('pyttsx3') is not None:
+                if await self._start_pyttsx3():
+                    voice_engines['pyttsx3'] = True
+            self._build_voice_catalog()
+            logger.info(f"🔄 Voice listing refreshed: {len(self.voice_profiles)} profiles")
+            return self._voices_json
+    
     def get_available_voices(self) -> Dict[str, Dict]:
         """Get all available voice profiles organized by engine."""
+        return self._voices_response
+    
+    def get_available_voices_json(self) -> str:
+        """Get the voice listing already serialized for a tool response."""
+        return self._voices_json
+    
+    def _build_voices_response(self) -> Dict[str, Dict]:
+        """Build the voice listing grouped by engine."""
         voices_by_engine = {}
         for profile in self.voice_profiles.values():
             engine = profile.engine
@@ -237,143 +989,466 @@ class VoiceNarrationEngine:
         """Narrate a story using the specified voice profile."""
         if voice_id not in self.voice_profiles:
             # Fallback to first available voice
-            available_voices = [v for v in self.voice_profiles.values() 
-                              if voice_engines.get(v.engine, False)]
-            if not available_voices:
+            if self._fallback_voice_id is None:
                 return {"error": "No voice engines available", "audio_file": None, "success": False}
-            voice_id = available_voices[0].id
+            voice_id = self._fallback_voice_id
         
         profile = self.voice_profiles[voice_id]
         
         if not voice_engines.get(profile.engine, False):
             return {"error": f"Voice engine {profile.engine} not available", "audio_file": None, "success": False}
         
+        # Identical text with the same voice always produces the same audio
+        cache_key = self.audio_cache.make_key(text, profile)
+        cached = self.audio_cache.get(cache_key)
+        if cached:
+            logger.info("⚡ Reusing cached narration for %s", voice_id)
+            if not save_file:
+                # Play back the cached audio instead of synthesizing it again
+                success = await self.audio_player.play_audio_file_async(cached["audio_file"])
+                if not success:
+                    logger.warning("⚠️ Audio playback failed")
+                return {**cached, "audio_file": None}
+            return cached
+        
+        if save_file:
+            # Concurrent requests for the same narration share one synthesis
+            pending = self._pending_narrations.get(cache_key)
+            if pending is None:
+                pending = asyncio.ensure_future(self._synthesize(text, profile, save_file, cache_key))
+                self._pending_narrations[cache_key] = pending
+                pending.add_done_callback(lambda _: self._pending_narrations.pop(cache_key, None))
+            # Shielded so one caller giving up does not cancel the others' narration
+            return dict(await asyncio.shield(pending))
+        return await self._synthesize(text, profile, save_file, cache_key)
+    
+    async def _synthesize(self, text: str, profile: VoiceProfile, save_file: bool,
+                          cache_key: str) -> Dict[str, Any]:
+        """Run the profile's engine on a cache miss and cache whatever audio it produces."""
+        cache_file = self.audio_cache.path_for(cache_key, profile.engine)
+        # Synthesize into a unique scratch file so concurrent narrations never share a path
+        extension = AudioCache.AUDIO_EXTENSIONS.get(profile.engine, "mp3")
+        audio_seq = next(self._audio_seq)
+        audio_file = str(self._scratch_dir / f"story_{audio_seq}.{extension}")
+        
         try:
-            if profile.engine == "pyttsx3":
-                return await self._narrate_pyttsx3(text, profile, save_file)
-            elif profile.engine == "gtts":
-                return await self._narrate_gtts(text, profile, save_file)
-            elif profile.engine == "edge_tts":
-                return await self._narrate_edge_tts(text, profile, save_file)
+            async with self._synth_semaphore:
+                if profile.engine == "pyttsx3":
+                    result = await self._narrate_pyttsx3(text, profile, save_file, audio_file)
+                elif profile.engine == "gtts":
+                    result = await self._narrate_gtts(text, profile, save_file, audio_file)
+                elif profile.engine == "edge_tts":
+                    result = await self._narrate_edge_tts(text, profile, save_file, audio_file)
+                else:
+                    return {"error": f"Unknown engine: {profile.engine}", "audio_file": None, "success": False}
+            
+            # Play-only narrations play after the synthesis slot is released
+            playback = result.pop("_playback", None)
+            if playback is not None and not await playback():
+                logger.warning("⚠️ Audio playback failed, but file saved")
+            
+            # Played-only narrations are cached too when the engine left the audio behind
+            if result.get("success") and (save_file or os.path.isfile(audio_file)):
+                # The cache directory may sit on another filesystem than the scratch files,
+                # so stage under a per-process name and swap it in atomically
+                staging_file = f"{cache_file}.{os.getpid()}.{audio_seq}.part"
+                shutil.move(audio_file, staging_file)
+                os.replace(staging_file, cache_file)
+                self.audio_cache.put(cache_key, {**result, "audio_file": cache_file})
+                if save_file:
+                    result["audio_file"] = cache_file
             else:
-                return {"error": f"Unknown engine: {profile.engine}", "audio_file": None, "success": False}
+                self._discard_file(audio_file)
+            return result
                 
         except Exception as e:
             logger.error(f"❌ Narration failed: {e}")
+            self._discard_file(audio_file)
             return {"error": str(e), "audio_file": None, "success": False}
     
-    async def _narrate_pyttsx3(self, text: str, profile: VoiceProfile, save_file: bool) -> Dict[str, Any]:
+    @staticmethod
+    def _discard_file(path: str):
+        """Remove a scratch audio file if it exists."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    
+    async def narrate_and_play_streaming(self, text: str, voice_id: str = "default_narrator") -> Dict[str, Any]:
+        """Narrate and play text right away, streaming Edge TTS audio to the player when possible."""
+        return await self.narrate_story(text, voice_id, save_file=False)
+    
+    async def narrate_stream(self, text: str, voice_id: str = "default_narrator") -> AsyncIterator[Dict[str, Any]]:
+        """Yield sentence narrations in story order as soon as each one is ready."""
+        sentences = [s for s in SENTENCE_BOUNDARY.split(text.strip()) if s]
+        # Start every sentence up front; the synthesis semaphore bounds how many run at once
+        tasks = [asyncio.create_task(self.narrate_story(sentence, voice_id, save_file=True))
+                 for sentence in sentences]
+        try:
+            for index, task in enumerate(tasks):
+                result = await task
+                yield {**result, "chunk": index, "chunks": len(tasks)}
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def merge_narrations(self, results: List[Dict[str, Any]], text: str,
+                               voice_id: str = "default_narrator") -> Dict[str, Any]:
+        """Combine per-sentence narrations of text into one result whose audio_file covers all of it.
+        
+        audio_files lists the per-sentence files in story order. WAV sentences cannot be joined
+        by concatenation, so their audio_file is None and callers play audio_files instead."""
+        for result in results:
+            if not result.get("success"):
+                return result
+        
+        merged = {key: value for key, value in results[0].items() if key != "cache_hit"}
+        merged["audio_files"] = [result.get("audio_file") for result in results]
+        merged["duration_estimate"] = sum(result.get("duration_estimate", 0) for result in results)
+        merged["audio_file"] = await self._join_narrations(merged, text, voice_id)
+        merged["chunks"] = len(results)
+        return merged
+    
+    async def _join_narrations(self, merged: Dict[str, Any], text: str, voice_id: str) -> Optional[str]:
+        """Join MP3 sentence files into one cached narration of the whole text."""
+        audio_files = merged["audio_files"]
+        if len(audio_files) == 1:
+            return audio_files[0]
+        profile = self.voice_profiles.get(voice_id) or self.voice_profiles.get(self._fallback_voice_id)
+        if profile is None or not all(str(f).endswith(".mp3") for f in audio_files):
+            return None
+        
+        cache_key = self.audio_cache.make_key(text, profile)
+        cached = self.audio_cache.get(cache_key)
+        if cached:
+            return cached["audio_file"]
+        loop = asyncio.get_running_loop()
+        try:
+            parts = await loop.run_in_executor(
+                self._tts_executor, lambda: [Path(audio_file).read_bytes() for audio_file in audio_files])
+        except OSError as e:
+            logger.warning(f"⚠️ Could not join sentence narrations: {e}")
+            return None
+        
+        # MP3 frames concatenate cleanly, so the parts join into one playable file
+        cache_file = self.audio_cache.path_for(cache_key, profile.engine)
+        staging_file = f"{cache_file}.{os.getpid()}.{next(self._audio_seq)}.part"
+        await self._write_audio(staging_file, b"".join(parts))
+        os.replace(staging_file, cache_file)
+        self.audio_cache.put(cache_key, {**{key: value for key, value in merged.items() if key != "audio_files"},
+                                         "audio_file": cache_file})
+        return cache_file
+    
+    @staticmethod
+    def _estimate_duration(text: str, seconds_per_word: float, speed: float = 1.0) -> float:
+        """Estimate spoken duration from a space count, without splitting the text."""
+        words = text.count(' ') + 1 if text else 0
+        return words * seconds_per_word / speed
+    
+    async def _narrate_pyttsx3(self, text: str, profile: VoiceProfile, save_file: bool,
+                                 audio_file: str) -> Dict[str, Any]:
         """Narrate using pyttsx3 (offline)."""
         def _speak():
             try:
                 engine = self.engines['pyttsx3']
                 
-                # Configure voice properties
-                engine.setProperty('rate', int(200 * profile.speed))
+                # Configure voice properties, skipping them when the last narration used the same ones
+                rate = int(200 * profile.speed)
+                voice_id = self._pyttsx3_voice_ids.get("female" if profile.gender == "female" else "default")
+                if self._pyttsx3_settings != (rate, voice_id):
+                    engine.setProperty('rate', rate)
+                    if voice_id:
+                        engine.setProperty('voice', voice_id)
+                    self._pyttsx3_settings = (rate, voice_id)
                 
-                # Try to set voice based on profile
-                voices = engine.getProperty('voices')
-                if voices:
-                    if profile.gender == "female" and len(voices) > 1:
-                        engine.setProperty('voice', voices[1].id)
-                    else:
-                        engine.setProperty('voice', voices[0].id)
+                # Always render to a file: playback then goes through the shared player,
+                # and played-only narrations can be cached like the others
+                engine.save_to_file(text, audio_file)
+                engine.runAndWait()
+                return audio_file
                 
-                if save_file:
-                    audio_file = os.path.join(self.temp_dir, f"story_{profile.id}.wav")
-                    engine.save_to_file(text, audio_file)
-                    engine.runAndWait()
-                    return audio_file
-                else:
-                    engine.say(text)
-                    engine.runAndWait()
-                    return None
-                    
             except Exception as e:
                 logger.error(f"❌ pyttsx3 error: {e}")
                 return None
         
-        # Run in thread to avoid blocking
-        audio_file = await asyncio.to_thread(_speak)
+        # Run on the engine's own thread; its single worker also serializes narrations
+        loop = asyncio.get_running_loop()
+        saved_file = await loop.run_in_executor(self._pyttsx3_executor, _speak)
+        
+        try:
+            # One stat confirms the file exists and is not empty
+            saved = bool(saved_file) and os.stat(saved_file).st_size > 0
+        except FileNotFoundError:
+            saved = False
         
-        if audio_file and os.path.exists(audio_file):
-            return {
+        if saved:
+            result = {
                 "success": True,
                 "engine": "pyttsx3",
                 "voice_name": profile.name,
-                "audio_file": audio_file,
-                "duration_estimate": len(text.split()) * 0.6 / profile.speed
+                "audio_file": audio_file if save_file else None,
+                "duration_estimate": self._estimate_duration(text, 0.6, profile.speed)
             }
+            if not save_file:
+                result["_playback"] = lambda: self.audio_player.play_audio_file_async(audio_file)
+            return result
         else:
             return {"error": "Failed to generate pyttsx3 audio", "success": False}
     
-    async def _narrate_gtts(self, text: str, profile: VoiceProfile, save_file: bool) -> Dict[str, Any]:
+    async def _narrate_gtts(self, text: str, profile: VoiceProfile, save_file: bool,
+                              audio_file: str) -> Dict[str, Any]:
         """Narrate using Google Text-to-Speech (online) - macOS compatible."""
         try:
-            tts = gTTS(text=text, lang=profile.language, slow=profile.speed < 0.9)
-            audio_file = os.path.join(self.temp_dir, f"story_{profile.id}.mp3")
+            from gtts import gTTS
+            tts = gTTS(text=text, lang=profile.language, slow=profile.speed < 0.9, timeout=GTTS_TIMEOUT)
             
             # Save audio file
-            await asyncio.to_thread(tts.save, audio_file)
-            
-            if not save_file:
-                # Play using system audio player (no pygame/Music app)
-                success = await asyncio.to_thread(self.audio_player.play_audio_file, audio_file)
-                if not success:
-                    logger.warning("⚠️ Audio playback failed, but file saved")
+            audio = None
+            if AIOHTTP_AVAILABLE and self._gtts_rpc_supported:
+                try:
+                    audio = await self._fetch_gtts_audio(tts, audio_file)
+                except AttributeError as e:
+                    # The aiohttp path reuses gTTS internals; if a release renames them, use gTTS's own save
+                    logger.warning(f"⚠️ gTTS internals changed ({e}), saving through gTTS instead")
+                    self._gtts_rpc_supported = False
+                else:
+                    if not audio:
+                        raise RuntimeError("Google TTS returned no audio")
+            if not audio:
+                loop = asyncio.get_running_loop()
+                async with self._gtts_semaphore:
+                    await loop.run_in_executor(self._tts_executor, tts.save, audio_file)
             
-            return {
+            result = {
                 "success": True,
                 "engine": "gtts",
                 "voice_name": profile.name,
                 "audio_file": audio_file if save_file else None,
-                "duration_estimate": len(text.split()) * 0.6,
-                "system": platform.system()
+                "duration_estimate": self._estimate_duration(text, 0.6),
+                "system": SYSTEM
             }
+            if not save_file:
+                # Play from the fetched bytes when possible rather than reading the file back;
+                # otherwise use the system audio player (no pygame/Music app)
+                result["_playback"] = ((lambda: self.audio_player.play_audio_data(audio, audio_file)) if audio
+                                       else (lambda: self.audio_player.play_audio_file_async(audio_file)))
+            return result
             
         except Exception as e:
             logger.error(f"❌ gTTS error: {e}")
             return {"error": str(e), "audio_file": None, "success": False}
     
-    async def _narrate_edge_tts(self, text: str, profile: VoiceProfile, save_file: bool) -> Dict[str, Any]:
-        """Narrate using Microsoft Edge TTS (online) - macOS compatible."""
+    def _get_http_session(self) -> "aiohttp.ClientSession":
+        """Get the shared HTTP session, creating it on first use."""
+        if self._http_session is None or self._http_session.closed:
+            import aiohttp
+            # Keep connections and DNS answers long enough to span the pauses between narrations
+            connector = aiohttp.TCPConnector(keepalive_timeout=60, ttl_dns_cache=300)
+            self._http_session = aiohttp.ClientSession(connector=connector)
+        return self._http_session
+    
+    async def close(self):
+        """Release network and audio resources held by the engine."""
+        await self.audio_cache.flush()
+        if self._http_session is not None and not self._http_session.closed:
+            await self._http_session.close()
+        self.audio_player.close_output_stream()
+        # The pyttsx3 driver lives for the whole session; stop it on the thread that owns it
+        engine = self.engines.pop('pyttsx3', None)
+        if engine is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._pyttsx3_executor, engine.stop)
+        self._pyttsx3_executor.shutdown(wait=False)
+        self._tts_executor.shutdown(wait=False)
+    
+    async def warm_up(self) -> Dict[str, bool]:
+        """Pay each enabled backend's first-use costs now instead of on the first narration."""
+        loop = asyncio.get_running_loop()
+        
+        def _pyttsx3_warm_up():
+            # The first render loads the driver's voice tables
+            warm_file = str(self._scratch_dir / "warmup.wav")
+            engine = self.engines['pyttsx3']
+            engine.save_to_file("Hello", warm_file)
+            engine.runAndWait()
+            try:
+                os.remove(warm_file)
+            except OSError:
+                pass
+        
+        warmups = {"audio": AudioPlayer._run_blocking(AudioPlayer.warm_up)}
+        if 'pyttsx3' in self.engines:
+            warmups["pyttsx3"] = loop.run_in_executor(self._pyttsx3_executor, _pyttsx3_warm_up)
+        # Leave a live connection in the gTTS pool; Edge TTS opens a fresh session per utterance
+        if self._can_pool_gtts():
+            warmups["gtts"] = self._open_gtts_connection()
+        
+        results = await asyncio.gather(*(asyncio.wait_for(w, timeout=5) for w in warmups.values()),
+                                       return_exceptions=True)
+        return {name: not isinstance(result, BaseException) and result is not False
+                for name, result in zip(warmups, results)}
+    
+    def _can_pool_gtts(self) -> bool:
+        """Whether gTTS requests go through the shared aiohttp session."""
+        return voice_engines['gtts'] and AIOHTTP_AVAILABLE and self._gtts_rpc_supported
+    
+    async def _open_gtts_connection(self) -> bool:
+        """Make one small request to Google TTS so a kept-alive TLS connection waits in the session pool."""
+        import aiohttp
+        session = self._get_http_session()
         try:
-            # Map profile to Edge TTS voice
-            voice_map = {
-                "edge_jenny": "en-US-JennyNeural",
-                "edge_guy": "en-US-GuyNeural", 
-                "edge_aria": "en-US-AriaNeural",
-                "edge_davis": "en-US-DavisNeural"
-            }
+            async with session.head(GTTS_URL.format(tld="com"), timeout=aiohttp.ClientTimeout(total=5)):
+                # Any answer will do: the connection, not the response, is what gets reused
+                return True
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+            return False
+    
+    async def prepare(self, voice_id: str) -> bool:
+        """Open a pooled connection for a gTTS voice, e.g. while its story is still being written."""
+        profile = self.voice_profiles.get(voice_id)
+        # Edge TTS opens its own connection per utterance and pyttsx3 is local, so only gTTS gains
+        if profile is None or profile.engine != "gtts" or not self._can_pool_gtts():
+            return False
+        return await self._open_gtts_connection()
+    
+    async def _fetch_gtts_audio(self, tts: "gTTS", audio_file: str) -> bytes:
+        """Request all gTTS text parts concurrently over aiohttp, write them in order and return the audio."""
+        import aiohttp
+        url = GTTS_URL.format(tld=tts.tld)
+        session = self._get_http_session()
+        timeout = aiohttp.ClientTimeout(total=tts.timeout or GTTS_TIMEOUT)
+        
+        async def _fetch_part(part: str) -> bytes:
+            async with self._gtts_semaphore, session.post(url, data=tts._package_rpc(part),
+                                                          headers=tts.GOOGLE_TTS_HEADERS,
+                                                          timeout=timeout) as response:
+                response.raise_for_status()
+                body = await response.text()
             
-            voice_name = voice_map.get(profile.id, "en-US-JennyNeural")
-            audio_file = os.path.join(self.temp_dir, f"story_{profile.id}.mp3")
+            decoded = []
+            for line in body.splitlines():
+                if "jQ1olc" in line:
+                    match = GTTS_AUDIO_PATTERN.search(line)
+                    if not match:
+                        raise RuntimeError("Google TTS response contained no audio")
+                    decoded.append(base64.b64decode(match.group(1)))
+            return b"".join(decoded)
+        
+        # Reuse gTTS's own tokenizer and RPC packaging so requests match the library;
+        # the parts are bare MPEG frames, so concatenating them in order yields one playable file
+        audio_parts = await asyncio.gather(*[_fetch_part(part) for part in tts._tokenize(tts.text)])
+        audio = b"".join(audio_parts)
+        await self._write_audio(audio_file, audio)
+        
+        # The returned audio stands in for a stat of the finished file
+        return audio
+    
+    async def _write_audio(self, audio_file: str, audio: bytes):
+        """Write synthesized audio without blocking the event loop."""
+        if AIOFILE_AVAILABLE:
+            from aiofile import async_open
+            async with async_open(audio_file, "wb") as f:
+                await f.write(audio)
+        elif AIOFILES_AVAILABLE:
+            import aiofiles
+            async with aiofiles.open(audio_file, "wb") as f:
+                await f.write(audio)
+        else:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._tts_executor, Path(audio_file).write_bytes, audio)
+    
+    async def _narrate_edge_tts(self, text: str, profile: VoiceProfile, save_file: bool,
+                                  audio_file: str) -> Dict[str, Any]:
+        """Narrate using Microsoft Edge TTS (online) - macOS compatible."""
+        try:
+            import edge_tts
+            voice_name = EDGE_TTS_VOICES.get(profile.id, "en-US-JennyNeural")
+            prosody = self._edge_tts_prosody(profile)
             
             # Generate speech
-            communicate = edge_tts.Communicate(text, voice_name)
-            await communicate.save(audio_file)
-            
-            if not save_file:
-                # Play using system audio player
-                success = await asyncio.to_thread(self.audio_player.play_audio_file, audio_file)
-                if not success:
-                    logger.warning("⚠️ Audio playback failed, but file saved")
+            playback = None
+            if not save_file and STREAMING_PLAYER:
+                # Start playback on the first audio chunk instead of after the whole file
+                communicate = edge_tts.Communicate(text, voice_name, **prosody)
+                async with self._edge_tts_semaphore:
+                    player = await self._stream_to_player(communicate, audio_file)
+                
+                async def playback() -> bool:
+                    # The player drains what it has buffered after synthesis ends
+                    return await player.wait() == 0
+            else:
+                await self._save_edge_tts(edge_tts, text, voice_name, audio_file, prosody)
+                if not save_file:
+                    # Play using system audio player
+                    playback = lambda: self.audio_player.play_audio_file_async(audio_file)
             
-            return {
+            result = {
                 "success": True,
                 "engine": "edge_tts",
                 "voice_name": profile.name,
                 "audio_file": audio_file if save_file else None,
-                "duration_estimate": len(text.split()) * 0.5,
-                "system": platform.system()
+                "duration_estimate": self._estimate_duration(text, 0.5, profile.speed),
+                "system": SYSTEM
             }
+            if playback is not None:
+                result["_playback"] = playback
+            return result
             
         except Exception as e:
             logger.error(f"❌ Edge TTS error: {e}")
             return {"error": str(e), "audio_file": None, "success": False}
 
+    @staticmethod
+    def _edge_tts_prosody(profile: VoiceProfile) -> Dict[str, str]:
+        """Express the profile's speed and pitch as Edge TTS rate and pitch adjustments."""
+        return {"rate": f"{round((profile.speed - 1) * 100):+d}%",
+                "pitch": f"{round((profile.pitch - 1) * 50):+d}Hz"}
+    
+    async def _save_edge_tts(self, edge_tts, text: str, voice_name: str, audio_file: str,
+                             prosody: Dict[str, str]):
+        """Save Edge TTS audio, synthesizing long text as parallel sentence sessions."""
+        sentences = [s for s in SENTENCE_BOUNDARY.split(text.strip()) if s]
+        if len(sentences) < 2 or len(text.split()) <= EDGE_TTS_SPLIT_WORDS:
+            async with self._edge_tts_semaphore:
+                await edge_tts.Communicate(text, voice_name, **prosody).save(audio_file)
+            return
+        
+        async def _synthesize(sentence: str) -> bytes:
+            async with self._edge_tts_semaphore:
+                communicate = edge_tts.Communicate(sentence, voice_name, **prosody)
+                return b"".join([chunk["data"] async for chunk in communicate.stream()
+                                 if chunk["type"] == "audio"])
+        
+        parts = await asyncio.gather(*[_synthesize(sentence) for sentence in sentences])
+        # MP3 frames concatenate cleanly, so the parts join into one playable file
+        await self._write_audio(audio_file, b"".join(parts))
+    
+    async def _stream_to_player(self, communicate: "edge_tts.Communicate",
+                                audio_file: str) -> "asyncio.subprocess.Process":
+        """Pipe Edge TTS audio into ffplay as it arrives, keeping a copy; returns the player still playing."""
+        process = await asyncio.create_subprocess_exec(
+            STREAMING_PLAYER, "-nodisp", "-autoexit", "-loglevel", "quiet", "-i", "pipe:0",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        parts = []
+        try:
+            async for chunk in communicate.stream():
+                if chunk["type"] == "audio":
+                    parts.append(chunk["data"])
+                    process.stdin.write(chunk["data"])
+                    await process.stdin.drain()
+            process.stdin.close()
+        except BaseException:
+            process.kill()
+            raise
+        # The same audio goes to the cache, so replaying this text skips synthesis
+        await self._write_audio(audio_file, b"".join(parts))
+        return process
+
 # Import original classes with modifications
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Story:
     """Represents a story with metadata for ranking."""
     title: str
@@ -387,44 +1462,79 @@ class Story:
 class ClaudeStoryGenerator:
     """Handles Claude API integration for story generation."""
     
+    # Seconds to gather new stories into one story cache write
+    STORY_CACHE_SAVE_DELAY = 1.0
+    
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv('ANTHROPIC_API_KEY')
         self.client = None
         self.available = False
+        # LRU of generated stories keyed by (moral, target_length, story_type), kept across runs
+        self._story_cache: "OrderedDict[Tuple[str, int, str], str]" = OrderedDict()
+        self._story_cache_size = 256
+        # Pending and running saves of the story cache
+        self._story_save_handle: Optional[asyncio.TimerHandle] = None
+        self._story_saving: Optional["asyncio.Future"] = None
+        self._story_write_lock = threading.Lock()
         
         if CLAUDE_AVAILABLE and self.api_key:
             try:
-                self.client = anthropic.Anthropic(api_key=self.api_key)
+                import anthropic
+                client_options = {}
+                if importlib.util.find_spec('h2') is not None and hasattr(anthropic, "DefaultAsyncHttpxClient"):
+                    # Multiplex concurrent story requests over one HTTP/2 connection
+                    client_options["http_client"] = anthropic.DefaultAsyncHttpxClient(http2=True)
+                self.client = anthropic.AsyncAnthropic(api_key=self.api_key, **client_options)
                 self.available = True
                 logger.info("✅ Claude API initialized successfully")
+                self._load_story_cache()
             except Exception as e:
                 logger.error(f"❌ Failed to initialize Claude: {e}")
                 self.available = False
         else:
             logger.warning("⚠️ Claude not available - using template fallback")
     
-    async def generate_story(self, moral: str, target_length: int, story_type: str = "adventure") -> Optional[str]:
-        """Generate a complete story using Claude."""
+    async def generate_story(self, moral: str, target_length: int, story_type: str = "adventure",
+                             on_sentence: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """Generate a complete story using Claude, optionally reporting sentences as they stream in."""
         if not self.available:
             return None
         
-        prompt = self._create_story_prompt(moral, target_length, story_type)
+        cache_key = (moral.lower(), target_length, story_type)
+        cached = self._story_cache.get(cache_key)
+        if cached:
+            self._story_cache.move_to_end(cache_key)
+            logger.info("⚡ Using cached Claude story for '%s'", moral)
+            if on_sentence:
+                for sentence in SENTENCE_BOUNDARY.split(cached):
+                    if sentence:
+                        on_sentence(sentence)
+            return cached
         
         try:
-            response = await asyncio.to_thread(
-                self.client.messages.create,
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=800,
-                temperature=0.8,
-                system="You are a creative children's storyteller who writes engaging, age-appropriate stories that teach important moral lessons. Your stories are designed for children ages 5-10 and are perfect for voice narration.",
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
+            parts = []
+            pending = ""
+            async with self.client.messages.stream(
+                **self._story_request_params(moral, target_length, story_type)
+            ) as stream:
+                async for delta in stream.text_stream:
+                    parts.append(delta)
+                    if on_sentence:
+                        # Hand off every completed sentence; keep the unfinished tail
+                        pending += delta
+                        *complete, pending = SENTENCE_BOUNDARY.split(pending)
+                        for sentence in complete:
+                            if sentence.strip():
+                                on_sentence(sentence.strip())
+            if on_sentence and pending.strip():
+                on_sentence(pending.strip())
+            story_text = "".join(parts).strip()
             
-            if response.content and len(response.content) > 0:
-                story_text = response.content[0].text.strip()
-                logger.info(f"✅ Claude generated {len(story_text.split())} word story for '{moral}'")
+            if story_text:
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("✅ Claude generated %d word story for '%s'", len(story_text.split()), moral)
+                self._cache_story(cache_key, story_text)
+                self._save_story_cache()
                 return story_text
             else:
                 logger.warning("⚠️ Claude returned empty response")
@@ -434,25 +1544,124 @@ class ClaudeStoryGenerator:
             logger.error(f"❌ Claude generation failed: {e}")
             return None
     
-    def _create_story_prompt(self, moral: str, target_length: int, story_type: str) -> str:
+    async def generate_stories(self, morals: List[str], target_length: int,
+                               story_type: str = "adventure") -> List[Optional[str]]:
+        """Generate stories for several morals with concurrent requests, in moral order."""
+        return list(await asyncio.gather(*[
+            self.generate_story(moral, target_length, story_type) for moral in morals
+        ]))
+    
+    async def generate_stories_batch(self, requests: List[Tuple[str, int]], story_type: str = "adventure",
+                                     poll_interval: float = 30.0) -> Dict[Tuple[str, int], str]:
+        """Generate many stories through the Message Batches API and keep them for later requests."""
+        if not self.available or not requests:
+            return {}
+        
+        try:
+            batch = await self.client.messages.batches.create(requests=[
+                {"custom_id": f"story-{index}", "params": self._story_request_params(moral, length, story_type)}
+                for index, (moral, length) in enumerate(requests)
+            ])
+            logger.info(f"📦 Submitted Claude batch {batch.id} with {len(requests)} stories")
+            
+            while batch.processing_status != "ended":
+                await asyncio.sleep(poll_interval)
+                batch = await self.client.messages.batches.retrieve(batch.id)
+            
+            stories = {}
+            async for entry in await self.client.messages.batches.results(batch.id):
+                if entry.result.type != "succeeded":
+                    continue
+                moral, length = requests[int(entry.custom_id.rsplit("-", 1)[1])]
+                story_text = "".join(block.text for block in entry.result.message.content
+                                     if block.type == "text").strip()
+                if story_text:
+                    self._cache_story((moral.lower(), length, story_type), story_text)
+                    stories[(moral, length)] = story_text
+            self._save_story_cache()
+            
+            logger.info(f"✅ Claude batch {batch.id} produced {len(stories)}/{len(requests)} stories")
+            return stories
+            
+        except Exception as e:
+            logger.error(f"❌ Claude batch generation failed: {e}")
+            return {}
+    
+    def _cache_story(self, key: Tuple[str, int, str], story_text: str):
+        """Remember a story, evicting the least recently used beyond the cache size."""
+        self._story_cache[key] = story_text
+        self._story_cache.move_to_end(key)
+        while len(self._story_cache) > self._story_cache_size:
+            self._story_cache.popitem(last=False)
+    
+    def _load_story_cache(self):
+        """Load stories saved by a previous run."""
+        try:
+            with open(STORY_CACHE_FILE, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            for moral, length, story_type, story_text in entries:
+                self._cache_story((moral, length, story_type), story_text)
+        except (OSError, ValueError, TypeError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"⚠️ Ignoring unreadable story cache: {e}")
+            return
+        logger.info(f"💾 Loaded {len(self._story_cache)} cached Claude stories")
+    
+    def _save_story_cache(self):
+        """Save the story cache shortly on a worker thread, folding back-to-back saves into one write."""
+        if self._story_save_handle is None:
+            loop = asyncio.get_running_loop()
+            self._story_save_handle = loop.call_later(self.STORY_CACHE_SAVE_DELAY, self._start_story_save, loop)
+    
+    def _start_story_save(self, loop: asyncio.AbstractEventLoop):
+        """Hand a snapshot of the story cache to a worker thread."""
+        self._story_save_handle = None
+        entries = [[*key, story_text] for key, story_text in self._story_cache.items()]
+        self._story_saving = loop.run_in_executor(None, self._write_story_cache, entries)
+    
+    def _write_story_cache(self, entries: List[List[Any]]):
+        """Write a story cache snapshot atomically for the next run."""
+        tmp_path = f"{STORY_CACHE_FILE}.{os.getpid()}.tmp"
+        with self._story_write_lock:
+            try:
+                os.makedirs(os.path.dirname(STORY_CACHE_FILE), exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(entries, f)
+                os.replace(tmp_path, STORY_CACHE_FILE)
+            except OSError as e:
+                logger.warning(f"⚠️ Could not save story cache: {e}")
+    
+    async def flush(self):
+        """Write out a pending story cache save now, waiting for any write under way."""
+        if self._story_save_handle is not None:
+            self._story_save_handle.cancel()
+            self._start_story_save(asyncio.get_running_loop())
+        if self._story_saving is not None:
+            await self._story_saving
+            self._story_saving = None
+    
+    def _story_request_params(self, moral: str, target_length: int, story_type: str) -> Dict[str, Any]:
+        """Build the Messages API parameters for one story."""
+        return {
+            "model": "claude-3-5-sonnet-20241022",
+            "max_tokens": 800,
+            "temperature": 0.8,
+            "system": STORY_SYSTEM_PROMPT,
+            "messages": [
+                {"role": "user", "content": self._create_story_prompt(moral, target_length, story_type)}
+            ]
+        }
+    
+    def _create_story_prompt(self, moral: str, target_length: int, story_type: str) -> List[Dict[str, Any]]:
         """Create a prompt for generating a complete story optimized for narration."""
-        return f"""Write a children's story that teaches the moral value of "{moral}". 
-
-Requirements:
-- Target length: approximately {target_length} words
-- Age appropriate for children 5-10 years old
-- Story style: {story_type}
-- IMPORTANT: Optimize for voice narration with clear pauses, engaging rhythm, and expressive dialogue
-- Use natural speech patterns and conversational tone
-- Include character voices that are distinct and fun to narrate
-- Add emotional cues and descriptive words that enhance audio storytelling
-- Structure sentences for easy speaking and listening comprehension
-- The moral lesson should be woven naturally into the story
-- Create memorable character names that are easy to pronounce
-- Please do not add any unnecessary notes about the story meaning at the end, just use the target length to write the story only.
-Focus on creating a story that sounds engaging when read aloud and teaches {moral} through compelling characters and situations.
+        return [
+            {"type": "text", "text": STORY_INSTRUCTIONS, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": f"""Moral: {moral}
+Target length: approximately {target_length} words
+Story style: {story_type}
 
-Please write the complete story now:"""
+Please write the complete story now:"""}
+        ]
 
 class HybridStoryAgent:
     """Base class for agents that can use both templates and Claude."""
@@ -463,14 +1672,24 @@ class HybridStoryAgent:
         self.story_type = story_type
         self.claude = claude_generator
         self.templates = {}
+        # Expansion sentences are fixed per agent, so tokenize them once
+        self._expansion_tokens = [expansion.split() for expansion in self._get_theme_expansions()]
+        # Template tokens and length-adjusted content, filled on first use
+        self._template_words: Dict[str, List[str]] = {}
+        # Bounded, since clients choose target lengths freely
+        self._adjusted_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._adjusted_cache_size = 1024
     
-    async def generate_story(self, moral: str, target_length: int) -> Story:
+    async def generate_story(self, moral: str, target_length: int,
+                             on_sentence: Optional[Callable[[str], None]] = None) -> Story:
         """Generate story using hybrid approach."""
-        if moral.lower() in self.templates:
-            base_story = await self._generate_from_template(moral, target_length)
+        moral_key = moral.lower()
+        if moral_key in self.templates:
+            base_story = await self._generate_from_template(moral, target_length, moral_key)
             
             if self.claude.available and abs(base_story.length - target_length) > 10:
-                enhanced_content = await self.claude.generate_story(moral, target_length, self.story_type)
+                enhanced_content = await self.claude.generate_story(moral, target_length, self.story_type,
+                                                                    on_sentence)
                 if enhanced_content:
                     base_story.content = enhanced_content
                     base_story.length = len(enhanced_content.split())
@@ -479,7 +1698,8 @@ class HybridStoryAgent:
             return base_story
         
         elif self.claude.available:
-            claude_content = await self.claude.generate_story(moral, target_length, self.story_type)
+            claude_content = await self.claude.generate_story(moral, target_length, self.story_type,
+                                                              on_sentence)
             if claude_content:
                 title = self._extract_or_generate_title(claude_content, moral)
                 
@@ -494,16 +1714,31 @@ class HybridStoryAgent:
         
         return await self._generate_fallback_story(moral, target_length)
     
-    async def _generate_from_template(self, moral: str, target_length: int) -> Story:
+    async def _generate_from_template(self, moral: str, target_length: int,
+                                      moral_key: Optional[str] = None) -> Story:
         """Generate story from predefined template."""
-        template = self.templates[moral.lower()]
-        content = self._adjust_story_length_basic(template["story"], target_length)
+        moral_key = moral_key or moral.lower()
+        template = self.templates[moral_key]
+        
+        cache_key = (moral_key, target_length)
+        adjusted = self._adjusted_cache.get(cache_key)
+        if adjusted is None:
+            words = self._template_words.get(moral_key)
+            if words is None:
+                words = self._template_words[moral_key] = template["story"].split()
+            content = self._adjust_length_from_words(words, target_length)
+            adjusted = self._adjusted_cache[cache_key] = (content, len(content.split()))
+            if len(self._adjusted_cache) > self._adjusted_cache_size:
+                self._adjusted_cache.popitem(last=False)
+        else:
+            self._adjusted_cache.move_to_end(cache_key)
+        content, length = adjusted
         
         return Story(
             title=template["title"],
             content=content,
             moral=moral,
-            length=len(content.split()),
+            length=length,
             agent_id=self.agent_id,
             generation_method="template"
         )
@@ -538,15 +1773,28 @@ class HybridStoryAgent:
     
     def _adjust_story_length_basic(self, base_story: str, target_length: int) -> str:
         """Basic length adjustment."""
-        words = base_story.split()
+        return self._adjust_length_from_words(base_story.split(), target_length)
+    
+    def _adjust_length_from_words(self, base_words: List[str], target_length: int) -> str:
+        """Basic length adjustment on an already tokenized story."""
+        words = list(base_words)
         current_length = len(words)
         
         if target_length > current_length:
-            expansions = self._get_theme_expansions()
-            while len(words) < target_length and expansions:
-                words.extend(random.choice(expansions).split())
+            expansion_tokens = self._expansion_tokens
+            while len(words) < target_length and expansion_tokens:
+                # Walk a fresh shuffle of the expansions before repeating any of them
+                for index in random.sample(range(len(expansion_tokens)), len(expansion_tokens)):
+                    words.extend(expansion_tokens[index])
+                    if len(words) >= target_length:
+                        break
         elif target_length < current_length:
-            words = words[:target_length]
+            truncated = " ".join(words[:target_length])
+            # End on the last full sentence when that keeps most of the requested length
+            head, sep, _ = truncated.rpartition('.')
+            if sep and len(head) > len(truncated) * 0.8:
+                return head + sep
+            return truncated
             
         return " ".join(words)
     
@@ -581,6 +1829,11 @@ class EnhancedAdventureAgent(HybridStoryAgent):
 class StoryRanker:
     """Enhanced ranking system."""
     
+    # Quality cues, each matched anywhere in the lowercased story with a single scan
+    OPENING_CUES = re.compile(r"once|story|adventure")
+    REALIZATION_CUES = re.compile(r"realized|understood|learned")
+    METHOD_BONUSES = {"claude": 0.9, "hybrid": 0.8, "template": 0.6}
+    
     @staticmethod
     def score_story(story: Story, target_length: int, moral: str) -> float:
         """Score a story with enhanced metrics."""
@@ -602,9 +1855,9 @@ class StoryRanker:
         # Story quality (25% weight)
         quality_score = 0.0
         
-        if any(word in content_lower for word in ['once', 'story', 'adventure']):
+        if StoryRanker.OPENING_CUES.search(content_lower):
             quality_score += 0.3
-        if any(word in content_lower for word in ['realized', 'understood', 'learned']):
+        if StoryRanker.REALIZATION_CUES.search(content_lower):
             quality_score += 0.3
         if '"' in story.content or "said" in content_lower:
             quality_score += 0.2
@@ -614,8 +1867,7 @@ class StoryRanker:
         score += min(quality_score, 1.0) * 0.25
         
         # Generation method bonus (15% weight)
-        method_bonuses = {"claude": 0.9, "hybrid": 0.8, "template": 0.6}
-        method_score = method_bonuses.get(story.generation_method, 0.5)
+        method_score = StoryRanker.METHOD_BONUSES.get(story.generation_method, 0.5)
         score += method_score * 0.15
         
         return min(score, 1.0)
@@ -628,15 +1880,20 @@ class EnhancedStorytellerPipeline:
         self.agents = [EnhancedAdventureAgent(self.claude)]
         self.ranker = StoryRanker()
     
-    async def generate_story(self, moral: str, target_length: int = 75) -> Dict[str, Any]:
-        """Generate and rank stories."""
-        stories = await asyncio.gather(*[agent.generate_story(moral, target_length) for agent in self.agents])
+    async def generate_story(self, moral: str, target_length: int = 75,
+                             on_sentence: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """Generate and rank stories, streaming sentences when a single agent writes the story."""
+        if len(self.agents) != 1:
+            # Sentences from competing agents would interleave
+            on_sentence = None
+        stories = await asyncio.gather(*[agent.generate_story(moral, target_length, on_sentence)
+                                         for agent in self.agents])
         
         for story in stories:
             story.score = self.ranker.score_story(story, target_length, moral)
-            
-        stories.sort(key=lambda s: s.score, reverse=True)
-        winner = stories[0]
+        
+        # Only the best story is used; max keeps the first of any tie, as the stable sort did
+        winner = max(stories, key=lambda s: s.score)
         
         return {
             "title": winner.title,
@@ -649,12 +1906,21 @@ class EnhancedStorytellerPipeline:
             "claude_available": self.claude.available,
         }
 
+class ToolError(Exception):
+    """Raised by a tool handler to report a bad call back to the client."""
+
 class EnhancedMCPServer:
     """Enhanced MCP Server with Voice Narration - macOS Compatible."""
     
-    def __init__(self, claude_api_key: Optional[str] = None):
-        self.pipeline = EnhancedStorytellerPipeline(claude_api_key)
-        self.voice_engine = VoiceNarrationEngine()
+    def __init__(self, claude_api_key: Optional[str] = None,
+                 pipeline: Optional[EnhancedStorytellerPipeline] = None,
+                 voice_engine: Optional[VoiceNarrationEngine] = None):
+        self.pipeline = pipeline or EnhancedStorytellerPipeline(claude_api_key)
+        self.voice_engine = voice_engine or VoiceNarrationEngine()
+        self._background_tasks = set()
+        # Narrations running behind already returned stories, by task ID
+        self._narration_tasks: Dict[str, asyncio.Task] = {}
+        self._narration_seq = itertools.count(1)
         self.tools = {
             "generate_story": {
                 "name": "generate_story",
@@ -665,7 +1931,8 @@ class EnhancedMCPServer:
                         "moral": {"type": "string", "description": "The moral to teach"},
                         "length": {"type": "integer", "description": "Target length in words", "default": 75},
                         "voice_id": {"type": "string", "description": "Voice profile ID for narration", "default": None},
-                        "narrate": {"type": "boolean", "description": "Whether to generate voice narration", "default": False}
+                        "narrate": {"type": "boolean", "description": "Whether to generate voice narration; voice_narration.audio_file covers the whole story, and sentence-by-sentence narrations also list their files in order as audio_files (audio_file is null when those WAV parts cannot be joined)", "default": False},
+                        "background_narration": {"type": "boolean", "description": "Return the story right away and narrate it in the background; fetch the audio with poll_narration", "default": False}
                     },
                     "required": ["moral"]
                 }
@@ -675,9 +1942,27 @@ class EnhancedMCPServer:
                 "description": "List available voice profiles for narration",
                 "parameters": {"type": "object", "properties": {}}
             },
+            "refresh_voices": {
+                "name": "refresh_voices",
+                "description": "Re-detect installed voice engines and return the updated voice listing",
+                "parameters": {"type": "object", "properties": {}}
+            },
             "narrate_text": {
                 "name": "narrate_text", 
                 "description": "Narrate any text with specified voice",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "text": {"type": "string", "description": "Text to narrate"},
+                        "voice_id": {"type": "string", "description": "Voice profile ID", "default": "default_narrator"},
+                        "play": {"type": "boolean", "description": "Play the narration on the server right away, streaming Edge TTS audio when possible, instead of returning a file", "default": False}
+                    },
+                    "required": ["text"]
+                }
+            },
+            "narrate_stream": {
+                "name": "narrate_stream",
+                "description": "Narrate text sentence by sentence, returning one audio frame per sentence",
                 "parameters": {
                     "type": "object",
                     "properties": {
@@ -686,98 +1971,526 @@ class EnhancedMCPServer:
                     },
                     "required": ["text"]
                 }
+            },
+            "generate_story_stream": {
+                "name": "generate_story_stream",
+                "description": "Generate a story as notifications: text deltas, per-sentence audio as it is ready, a reset if that audio belongs to a discarded draft, then the full story",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "moral": {"type": "string", "description": "The moral to teach"},
+                        "length": {"type": "integer", "description": "Target length in words", "default": 75},
+                        "voice_id": {"type": "string", "description": "Voice profile ID for narration; omit for text only", "default": None}
+                    },
+                    "required": ["moral"]
+                }
+            },
+            "get_capabilities": {
+                "name": "get_capabilities",
+                "description": "Report Claude and voice engine availability without generating anything",
+                "parameters": {"type": "object", "properties": {}}
+            },
+            "poll_narration": {
+                "name": "poll_narration",
+                "description": "Check on a background narration started by generate_story",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "task_id": {"type": "string", "description": "Narration task ID returned by generate_story"}
+                    },
+                    "required": ["task_id"]
+                }
+            },
+            "pregenerate_story_set": {
+                "name": "pregenerate_story_set",
+                "description": "Generate stories for several morals in the background via Claude's batch API",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "morals": {"type": "array", "items": {"type": "string"}, "description": "Morals to pregenerate"},
+                        "length": {"type": "integer", "description": "Target length in words", "default": 75},
+                        "immediate": {"type": "boolean", "description": "Generate the stories now with concurrent requests and return them, instead of submitting a background batch", "default": False}
+                    },
+                    "required": ["morals"]
+                }
             }
         }
+        self._tool_handlers = {
+            "generate_story": self._tool_generate_story,
+            "list_voices": self._tool_list_voices,
+            "refresh_voices": self._tool_refresh_voices,
+            "narrate_text": self._tool_narrate_text,
+            "narrate_stream": self._tool_narrate_stream,
+            "generate_story_stream": self._tool_generate_story_stream,
+            "poll_narration": self._tool_poll_narration,
+            "get_capabilities": self._tool_get_capabilities,
+            "pregenerate_story_set": self._tool_pregenerate_story_set
+        }
+        # Required arguments per tool, checked before dispatch so bad calls are rejected without raising
+        self._required_params = {name: tuple(tool["parameters"].get("required", ()))
+                                 for name, tool in self.tools.items()}
+        self._method_handlers = {
+            "tools/list": self._list_tools,
+            "tools/call": self._call_tool
+        }
+        # Tools that handle_stream can answer incrementally, with the notification that closes each stream
+        self._stream_handlers = {
+            "generate_story_stream": (self.stream_story, "story/end"),
+            "narrate_stream": (self.stream_narration, "narration/end")
+        }
+    
+    @classmethod
+    async def create(cls, claude_api_key: Optional[str] = None) -> "EnhancedMCPServer":
+        """Build the server, initializing the story pipeline and voice engines concurrently."""
+        # Claude client setup and pyttsx3 driver startup are independent and both block
+        loop = asyncio.get_running_loop()
+        pipeline, voice_engine = await asyncio.gather(
+            loop.run_in_executor(None, EnhancedStorytellerPipeline, claude_api_key),
+            VoiceNarrationEngine.create()
+        )
+        return cls(claude_api_key, pipeline=pipeline, voice_engine=voice_engine)
+    
+    async def close(self):
+        """Save pending cache writes and release the voice engine's resources."""
+        await self.pipeline.claude.flush()
+        await self.voice_engine.close()
+    
+    async def handle_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Handle a JSON-RPC style batch concurrently, answering in request order."""
+        responses = await asyncio.gather(*[self.handle_request(request) for request in requests])
+        return [{"id": request["id"], **response} if "id" in request else response
+                for request, response in zip(requests, responses)]
     
     async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Handle incoming MCP requests with voice capabilities."""
+        if isinstance(request, list):
+            return await self.handle_batch(request)
+        
         try:
-            if request.get("method") == "tools/list":
-                return {"tools": list(self.tools.values())}
-            
-            elif request.get("method") == "tools/call":
-                tool_name = request.get("params", {}).get("name")
-                args = request.get("params", {}).get("arguments", {})
-                
-                if tool_name == "generate_story":
-                    moral = args.get("moral")
-                    length = args.get("length", 75)
-                    voice_id = args.get("voice_id")
-                    narrate = args.get("narrate", False)
-                    
-                    if not moral:
-                        return {"error": "Missing required parameter: moral"}
-                    
-                    # Generate story
-                    result = await self.pipeline.generate_story(moral, length)
-                    
-                    # Add voice narration if requested
-                    if narrate and voice_id:
-                        logger.info(f"🎙️ Generating voice narration with {voice_id}")
-                        narration_result = await self.voice_engine.narrate_story(
-                            result["content"], voice_id, save_file=True
-                        )
-                        result["voice_narration"] = narration_result
-                    
-                    # Add available voices info
-                    result["available_voices"] = self.voice_engine.get_available_voices()
-                    
-                    return {"content": [{"type": "text", "text": json.dumps(result, indent=2)}]}
-                
-                elif tool_name == "list_voices":
-                    voices = self.voice_engine.get_available_voices()
-                    return {"content": [{"type": "text", "text": json.dumps(voices, indent=2)}]}
-                
-                elif tool_name == "narrate_text":
-                    text = args.get("text")
-                    voice_id = args.get("voice_id", "default_narrator")
-                    
-                    if not text:
-                        return {"error": "Missing required parameter: text"}
-                    
-                    result = await self.voice_engine.narrate_story(text, voice_id, save_file=True)
-                    return {"content": [{"type": "text", "text": json.dumps(result, indent=2)}]}
-                
-                else:
-                    return {"error": f"Unknown tool: {tool_name}"}
-            
-            else:
-                return {"error": f"Unknown method: {request.get('method')}"}
+            method = request.get("method")
+            handler = self._method_handlers.get(method)
+            if handler is None:
+                return {"error": f"Unknown method: {method}"}
+            return await handler(request.get("params", {}))
                 
         except Exception as e:
             logger.error(f"❌ Error handling request: {e}")
             return {"error": str(e)}
     
+    async def _list_tools(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer tools/list with the tool schemas."""
+        return {"tools": list(self.tools.values())}
+    
+    async def _call_tool(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer tools/call by running the named tool handler."""
+        tool_name = params.get("name")
+        args = params.get("arguments", {})
+        
+        handler = self._tool_handlers.get(tool_name)
+        if handler is None:
+            return {"error": f"Unknown tool: {tool_name}"}
+        missing = self._missing_param(tool_name, args)
+        if missing:
+            return {"error": f"Missing required parameter: {missing}"}
+        
+        started = time.perf_counter()
+        try:
+            payload = await handler(args)
+        except ToolError as e:
+            return {"error": str(e)}
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("⏱️ %s took %.3fs", tool_name, time.perf_counter() - started)
+        
+        # Handlers return one payload, or a list of payloads sent as separate frames;
+        # a payload that is already a string was serialized ahead of time
+        frames = payload if isinstance(payload, list) else [payload]
+        return {"content": [{"type": "text", "text": frame if isinstance(frame, str) else dumps_json(frame)}
+                            for frame in frames]}
+    
+    async def handle_stream(self, request: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Handle a streaming tool call, yielding JSON-RPC notifications as they happen."""
+        tool_name = request.get("params", {}).get("name")
+        args = request.get("params", {}).get("arguments", {})
+        
+        handler = self._stream_handlers.get(tool_name) if request.get("method") == "tools/call" else None
+        if handler is None:
+            # Everything else answers in one response; send it as the closing notification
+            response = await self.handle_request(request)
+            yield self._notification("story/end", response)
+            return
+        
+        stream, end_method = handler
+        missing = self._missing_param(tool_name, args)
+        if missing:
+            yield self._notification(end_method, {"error": f"Missing required parameter: {missing}"})
+            return
+        try:
+            async for notification in stream(args):
+                yield notification
+        except ToolError as e:
+            yield self._notification(end_method, {"error": str(e)})
+        except Exception as e:
+            logger.error(f"❌ Error streaming {tool_name}: {e}")
+            yield self._notification(end_method, {"error": str(e)})
+    
+    def _missing_param(self, tool_name: str, args: Dict[str, Any]) -> Optional[str]:
+        """Return the first required argument of a tool that is missing or empty."""
+        for param in self._required_params.get(tool_name, ()):
+            if not args.get(param):
+                return param
+        return None
+    
+    @staticmethod
+    def _notification(method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Build a JSON-RPC notification, which carries no ID and expects no reply."""
+        notification = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            notification["params"] = params
+        return notification
+    
+    async def stream_narration(self, args: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Yield narration/chunk as each sentence's audio is ready, in order, then narration/end."""
+        text = args.get("text")
+        voice_id = args.get("voice_id", "default_narrator")
+        
+        if not text:
+            raise ToolError("Missing required parameter: text")
+        if len(text) > MAX_NARRATE_CHARS:
+            raise ToolError(f"Text too long to narrate: {len(text)} characters (max {MAX_NARRATE_CHARS})")
+        
+        chunks = 0
+        async for chunk in self.voice_engine.narrate_stream(text, voice_id):
+            chunks += 1
+            yield self._notification("narration/chunk", chunk)
+        yield self._notification("narration/end", {"chunks": chunks})
+    
+    async def stream_story(self, args: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Yield story/delta per sentence, story/voice_ready per narrated sentence, then story/end.
+        
+        A story/reset means the sentence audio announced so far belongs to a discarded draft."""
+        moral = self._story_moral(args)
+        length = self._story_length(args)
+        voice_id = args.get("voice_id")
+        
+        deltas: asyncio.Queue = asyncio.Queue()
+        streamed_sentences = []
+        narration_tasks = []
+        # Sentence narrations not announced yet, in story order
+        unannounced: "deque[asyncio.Task]" = deque()
+        
+        def _on_sentence(sentence: str):
+            streamed_sentences.append(sentence)
+            deltas.put_nowait(self._notification("story/delta", {"text": sentence}))
+            if voice_id:
+                task = asyncio.create_task(self.voice_engine.narrate_story(sentence, voice_id, save_file=True))
+                narration_tasks.append(task)
+                unannounced.append(task)
+        
+        async def _generate():
+            try:
+                return await self.pipeline.generate_story(moral, length, on_sentence=_on_sentence)
+            finally:
+                deltas.put_nowait(None)
+        
+        generation = asyncio.create_task(_generate())
+        next_delta = None
+        result = None
+        announced = False
+        try:
+            # Deltas go out as they stream; sentence audio goes out in story order once synthesized,
+            # waiting only on the oldest narration so it never holds back the text
+            streaming = True
+            draft_replaced = False
+            while streaming or unannounced:
+                if streaming and next_delta is None:
+                    next_delta = asyncio.ensure_future(deltas.get())
+                waiting = {next_delta} if next_delta is not None else set()
+                if unannounced:
+                    waiting.add(unannounced[0])
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                
+                if next_delta in done:
+                    delta, next_delta = next_delta.result(), None
+                    if delta is None:
+                        streaming = False
+                        result = await generation
+                        # Templates and fallbacks do not stream, and a failed Claude stream falls back to them
+                        draft_replaced = " ".join(streamed_sentences).split() != result["content"].split()
+                        if draft_replaced:
+                            for task in unannounced:
+                                task.cancel()
+                            unannounced.clear()
+                    else:
+                        yield delta
+                while unannounced and unannounced[0].done():
+                    narration = unannounced.popleft().result()
+                    if narration.get("success") and narration.get("audio_file"):
+                        announced = True
+                        yield self._notification("story/voice_ready", {"audio_file": narration["audio_file"]})
+            
+            if draft_replaced:
+                if announced:
+                    yield self._notification("story/reset", {})
+                if not streamed_sentences:
+                    yield self._notification("story/delta", {"text": result["content"]})
+                if voice_id:
+                    async for narration in self.voice_engine.narrate_stream(result["content"], voice_id):
+                        if narration.get("success") and narration.get("audio_file"):
+                            yield self._notification("story/voice_ready", {"audio_file": narration["audio_file"]})
+            yield self._notification("story/end", result)
+        finally:
+            generation.cancel()
+            if next_delta is not None:
+                next_delta.cancel()
+            for task in narration_tasks:
+                task.cancel()
+    
+    @staticmethod
+    def _story_moral(args: Dict[str, Any]) -> str:
+        """Read the requested moral, which must be a non-empty string."""
+        moral = args.get("moral")
+        if not moral:
+            raise ToolError("Missing required parameter: moral")
+        if not isinstance(moral, str) or not moral.strip():
+            raise ToolError(f"Invalid moral: {moral!r}")
+        return moral
+    
+    @staticmethod
+    def _story_length(args: Dict[str, Any]) -> int:
+        """Read the requested story length, clamped to what the generators handle."""
+        try:
+            length = int(args.get("length", 75))
+        except (TypeError, ValueError):
+            raise ToolError(f"Invalid length: {args.get('length')!r}")
+        return min(max(length, MIN_STORY_WORDS), MAX_STORY_WORDS)
+    
+    @staticmethod
+    def _story_morals(args: Dict[str, Any]) -> List[str]:
+        """Read the morals to pregenerate, which must be a short list of non-empty strings."""
+        morals = args.get("morals")
+        if not morals:
+            raise ToolError("Missing required parameter: morals")
+        if not isinstance(morals, list) or not all(isinstance(moral, str) and moral.strip() for moral in morals):
+            raise ToolError("Invalid morals: expected a list of non-empty strings")
+        if len(morals) > MAX_PREGENERATE_MORALS:
+            raise ToolError(f"Too many morals: {len(morals)} (max {MAX_PREGENERATE_MORALS})")
+        return morals
+    
+    async def _tool_generate_story(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate a story, optionally with voice narration."""
+        moral = self._story_moral(args)
+        length = self._story_length(args)
+        voice_id = args.get("voice_id")
+        narrate = args.get("narrate", False)
+        
+        # Generate story, narrating alongside generation if requested
+        if narrate and voice_id and args.get("background_narration", False):
+            # Get a gTTS connection open while the story is written
+            prepare_task = asyncio.create_task(self.voice_engine.prepare(voice_id))
+            result = await self.pipeline.generate_story(moral, length)
+            task_id = f"narration-{next(self._narration_seq)}"
+            # The connection only has to be ready for narration, not for the story to go back
+            task = asyncio.create_task(self._narrate_when_prepared(prepare_task, result["content"], voice_id))
+            self._narration_tasks[task_id] = task
+            task.add_done_callback(lambda _: self._expire_narration(task_id))
+            logger.info("🎙️ Narrating with %s in the background as %s", voice_id, task_id)
+            result["voice_narration"] = {"status": "pending", "task_id": task_id}
+        elif narrate and voice_id:
+            logger.info("🎙️ Generating voice narration with %s", voice_id)
+            result, narration_result = await self._generate_and_narrate(moral, length, voice_id)
+            result["voice_narration"] = narration_result
+        else:
+            result = await self.pipeline.generate_story(moral, length)
+        
+        # Add available voices info
+        result["available_voices"] = self.voice_engine.get_available_voices()
+        
+        return result
+    
+    async def _narrate_when_prepared(self, prepare_task: "asyncio.Task", text: str,
+                                     voice_id: str) -> Dict[str, Any]:
+        """Narrate once the voice's connection warm-up has finished."""
+        await prepare_task
+        return await self.voice_engine.narrate_story(text, voice_id, save_file=True)
+    
+    async def _tool_list_voices(self, args: Dict[str, Any]) -> str:
+        """List available voice profiles."""
+        voices = self.voice_engine.get_available_voices_json()
+        return voices
+    
+    async def _tool_refresh_voices(self, args: Dict[str, Any]) -> str:
+        """Rebuild the voice listing after engines are installed or removed."""
+        return await self.voice_engine.refresh_voices()
+    
+    async def _tool_narrate_text(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Narrate arbitrary text to an audio file, or play it right away."""
+        text = args.get("text")
+        voice_id = args.get("voice_id", "default_narrator")
+        play = args.get("play", False)
+        
+        if not text:
+            raise ToolError("Missing required parameter: text")
+        if len(text) > MAX_NARRATE_CHARS:
+            raise ToolError(f"Text too long to narrate: {len(text)} characters (max {MAX_NARRATE_CHARS})")
+        
+        if play:
+            return await self.voice_engine.narrate_and_play_streaming(text, voice_id)
+        result = await self.voice_engine.narrate_story(text, voice_id, save_file=True)
+        return result
+    
+    async def _tool_narrate_stream(self, args: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Narrate text as ordered per-sentence frames."""
+        text = args.get("text")
+        voice_id = args.get("voice_id", "default_narrator")
+        
+        if not text:
+            raise ToolError("Missing required parameter: text")
+        if len(text) > MAX_NARRATE_CHARS:
+            raise ToolError(f"Text too long to narrate: {len(text)} characters (max {MAX_NARRATE_CHARS})")
+        
+        return [chunk async for chunk in self.voice_engine.narrate_stream(text, voice_id)]
+    
+    async def _tool_generate_story_stream(self, args: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Generate a story as its notifications, for callers that cannot consume a stream."""
+        return [notification async for notification in self.stream_story(args)]
+    
+    async def _tool_get_capabilities(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Report what this server can do, without calling Claude."""
+        return {
+            "claude_available": self.pipeline.claude.available,
+            "voice_engines": dict(voice_engines),
+            "streaming_playback": bool(STREAMING_PLAYER),
+            "system": SYSTEM
+        }
+    
+    async def _tool_poll_narration(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Report a background narration, handing back its result once finished."""
+        task_id = args.get("task_id")
+        
+        if not task_id:
+            raise ToolError("Missing required parameter: task_id")
+        task = self._narration_tasks.get(task_id)
+        if task is None:
+            raise ToolError(f"Unknown narration task: {task_id}")
+        
+        if not task.done():
+            result = {"status": "pending", "task_id": task_id}
+        else:
+            # Finished results are handed out once, then forgotten
+            del self._narration_tasks[task_id]
+            result = {"status": "done", "task_id": task_id, **task.result()}
+        return result
+    
+    def _expire_narration(self, task_id: str):
+        """Forget a finished background narration if nobody polls it within the TTL."""
+        asyncio.get_running_loop().call_later(NARRATION_RESULT_TTL, self._narration_tasks.pop, task_id, None)
+    
+    async def _tool_pregenerate_story_set(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Submit a background batch that fills the story cache, or generate the stories right away."""
+        morals = self._story_morals(args)
+        length = self._story_length(args)
+        
+        if not self.pipeline.claude.available:
+            raise ToolError("Claude not available - cannot pregenerate stories")
+        
+        if args.get("immediate", False):
+            # Concurrent requests cost more than a batch but answer within one call
+            stories = await self.pipeline.claude.generate_stories(morals, length)
+            generated = {moral: story for moral, story in zip(morals, stories) if story}
+            return {"status": "generated", "stories": len(generated), "content": generated,
+                    "failed": [moral for moral in morals if moral not in generated]}
+        
+        # Batches may take a while; fill the story cache in the background
+        requests = [(moral, length) for moral in morals]
+        task = asyncio.create_task(self.pipeline.claude.generate_stories_batch(requests))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        
+        result = {"status": "submitted", "stories": len(requests)}
+        return result
+    
+    async def _generate_and_narrate(self, moral: str, length: int, voice_id: str):
+        """Generate a story while narrating its sentences as Claude streams them."""
+        streamed_sentences = []
+        narration_tasks = []
+        
+        def _on_sentence(sentence: str):
+            streamed_sentences.append(sentence)
+            narration_tasks.append(asyncio.create_task(
+                self.voice_engine.narrate_story(sentence, voice_id, save_file=True)
+            ))
+        
+        # Open a gTTS connection while Claude works on the first sentence
+        prepare_task = asyncio.create_task(self.voice_engine.prepare(voice_id))
+        result = await self.pipeline.generate_story(moral, length, on_sentence=_on_sentence)
+        await prepare_task
+        
+        # Use the sentence narrations only if they cover exactly the winning story
+        if narration_tasks and " ".join(streamed_sentences).split() == result["content"].split():
+            chunk_results = await asyncio.gather(*narration_tasks)
+            return result, await self.voice_engine.merge_narrations(chunk_results, result["content"], voice_id)
+        
+        for task in narration_tasks:
+            task.cancel()
+        
+        # Edge TTS splits long text into parallel sentence sessions inside narrate_story
+        narration_result = await self.voice_engine.narrate_story(result["content"], voice_id, save_file=True)
+        return result, narration_result
+    
+    async def prewarm(self):
+        """Narrate the template stories and a short preview per voice so first requests hit the cache."""
+        templates = [template["story"] for agent in self.pipeline.agents
+                     for template in agent.templates.values()]
+        previews = [(f"This is the {profile.name}.", voice_id)
+                    for voice_id, profile in self.voice_engine.voice_profiles.items()
+                    if voice_engines.get(profile.engine, False)]
+        
+        logger.info(f"🔥 Pre-warming {len(templates)} template stories and {len(previews)} voice previews")
+        results = await asyncio.gather(
+            *[self.voice_engine.narrate_story(story, "default_narrator") for story in templates],
+            *[self.voice_engine.narrate_story(text, voice_id) for text, voice_id in previews]
+        )
+        warmed = sum(1 for r in results if r.get("success"))
+        logger.info(f"🔥 Pre-warmed {warmed}/{len(results)} narrations")
+    
     async def start_server(self, host: str = "localhost", port: int = 8000):
         """Start the enhanced MCP server with voice capabilities."""
         logger.info(f"🚀 Starting Enhanced Voice-Enabled Storyteller Server on {host}:{port}")
-        logger.info(f"🖥️ System: {platform.system()}")
+        logger.info(f"🖥️ System: {SYSTEM}")
         logger.info(f"🤖 Claude API: {'✅ Available' if self.pipeline.claude.available else '❌ Not Available'}")
         
         # Test voice engines
-        logger.info("🎵 Testing voice engines...")
         voices = self.voice_engine.get_available_voices()
-        for engine, voice_list in voices.items():
-            available_count = sum(1 for v in voice_list if v['available'])
-            status = "✅" if available_count > 0 else "❌"
-            logger.info(f"  {status} {engine}: {available_count} voices available")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("🎵 Testing voice engines...")
+            for engine, voice_list in voices.items():
+                available_count = sum(1 for v in voice_list if v['available'])
+                status = "✅" if available_count > 0 else "❌"
+                logger.info("  %s %s: %d voices available", status, engine, available_count)
         
         # Test audio support
-        audio_support = self.voice_engine.audio_player.is_audio_supported()
+        audio_support = self.voice_engine.audio_support
         if any(audio_support.values()):
-            logger.info("🔊 Audio playback: ✅ Supported")
-            for player, supported in audio_support.items():
-                if supported:
-                    logger.info(f"  - {player}: ✅")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("🔊 Audio playback: ✅ Supported")
+                for player, supported in audio_support.items():
+                    if supported:
+                        logger.info("  - %s: ✅", player)
         else:
             logger.warning("🔊 Audio playback: ⚠️ Limited support")
         
+        # Move cold-start costs off the first narration
+        started = time.perf_counter()
+        warmed = await self.voice_engine.warm_up()
+        logger.info("🔥 Backends warmed in %d ms: %s", (time.perf_counter() - started) * 1000,
+                    ", ".join(name for name, ok in warmed.items() if ok) or "none")
+        
         return {
             "status": "Voice-enabled server ready (macOS compatible)", 
             "claude_available": self.pipeline.claude.available,
             "voice_engines": voices,
             "audio_support": audio_support,
-            "system": platform.system()
+            "system": SYSTEM
         }
 
 async def main():
@@ -787,7 +2500,7 @@ async def main():
     print("=" * 50)
     
     # System info
-    system = platform.system()
+    system = SYSTEM
     print(f"🖥️ System: {system}")
     
     # Check voice dependencies
@@ -803,8 +2516,7 @@ async def main():
     
     # Check audio support
     print(f"\n🔊 Checking audio playback support...")
-    audio_player = AudioPlayer()
-    audio_support = audio_player.is_audio_supported()
+    audio_support = AudioPlayer.is_audio_supported()
     
     if system == "Darwin":
         if audio_support.get("afplay", False):
@@ -819,9 +2531,13 @@ async def main():
             print("  ⚠️ No audio players found")
     
     print("\n📦 Starting server...")
-    server = EnhancedMCPServer()
+    server = await EnhancedMCPServer.create()
     result = await server.start_server()
     
+    if os.getenv("HIKAYA_PREWARM") == "1":
+        print("🔥 Pre-warming narration cache...")
+        await server.prewarm()
+    
     print(f"\nStatus: {result['status']}")
     print(f"Claude: {'✅ Active' if result['claude_available'] else '❌ Template Mode'}")
     print("🎵 Voice engines ready for narration!")
@@ -832,7 +2548,10 @@ async def main():
         print("  - Audio will use afplay (native macOS player)")
         print("  - No Music app will open during playback")
         print("  - System volume controls audio output")
+    
+    await server.close()
 
 if __name__ == "__main__":
+    install_event_loop()
     asyncio.run(main())
                 